@@ -1,9 +1,13 @@
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from typing import List, Dict, Optional
 from datetime import datetime
 import json
+from context import new_conversation
+from llm import make_client
+from semantic_cache import make_cache
 
 app = FastAPI(title="ACLSA AI Agent")
 
@@ -233,40 +237,68 @@ Could you provide more details about what you'd like to learn or accomplish? The
 
 What aspect would you like to explore first?"""
 
+SYSTEM_PROMPT = """You are ACLSA (AI-powered Course Learning Support Assistant), an intelligent AI agent designed to help students with their learning journey.
+
+Your capabilities:
+- Help students understand complex topics
+- Provide study recommendations and learning paths
+- Answer questions about various subjects
+- Create personalized learning plans
+- Offer career guidance and skill development advice
+- Track learning progress and suggest improvements
+
+You are friendly, encouraging, and educational. Always provide clear, helpful responses tailored to the student's needs."""
+
+# The fake provider answers with the rule-based generator above
+llm = make_client(responder=generate_intelligent_response)
+# Near-duplicate questions in the same context reuse an earlier answer
+cache = make_cache()
+
+def cache_for(messages):
+    """The cache, when the answer cannot depend on earlier turns
+
+    Only the system prompt and the new message means no history (and no
+    summary) went into the prompt.
+    """
+    return cache if len(messages) == 2 else None
+
+def add_user_message(user_id: str, message: str):
+    """Append to the user's history and return the token-budgeted prompt"""
+    if user_id not in conversations:
+        conversations[user_id] = new_conversation()
+    conversation = conversations[user_id]
+    conversation.add("user", message)
+    return conversation.build(SYSTEM_PROMPT)
+
+@app.on_event("shutdown")
+async def shutdown():
+    await llm.provider.close()
+
 @app.get("/health")
 def health():
     return {"status": "healthy", "service": "aclsa-agent"}
 
+@app.get("/metrics/llm")
+def llm_metrics():
+    return {**llm.metrics(), "cache": cache.metrics() if cache is not None else None}
+
 @app.post("/message", response_model=MessageResponse)
 async def send_message(request: MessageRequest):
     """Main chat endpoint - handles user messages"""
     
     try:
-        # Initialize conversation history for new users
-        if request.user_id not in conversations:
-            conversations[request.user_id] = []
-        
-        # Add user message to history
-        conversations[request.user_id].append({
-            "role": "user",
-            "content": request.message
-        })
+        messages = add_user_message(request.user_id, request.message)
+        shared = cache_for(messages)
         
-        # Keep only last 10 messages to manage memory
-        if len(conversations[request.user_id]) > 10:
-            conversations[request.user_id] = conversations[request.user_id][-10:]
-        
-        # Generate intelligent response
-        assistant_message = generate_intelligent_response(
-            request.message,
-            conversations[request.user_id]
-        )
+        assistant_message = shared.get(request.message, request.context) if shared is not None else None
+        if assistant_message is None:
+            # Generate response without blocking other users' requests
+            assistant_message = await llm.complete(messages)
+            if shared is not None:
+                shared.put(request.message, assistant_message, request.context)
         
         # Add assistant response to history
-        conversations[request.user_id].append({
-            "role": "assistant",
-            "content": assistant_message
-        })
+        conversations[request.user_id].add("assistant", assistant_message)
         
         return MessageResponse(
             response=assistant_message,
@@ -283,11 +315,38 @@ async def send_message(request: MessageRequest):
             user_id=request.user_id
         )
 
+@app.post("/message/stream")
+async def stream_message(request: MessageRequest):
+    """Same as /message, streamed as plain-text tokens"""
+    
+    messages = add_user_message(request.user_id, request.message)
+    shared = cache_for(messages)
+    
+    cached = shared.get(request.message, request.context) if shared is not None else None
+    
+    async def tokens():
+        if cached is not None:
+            conversations[request.user_id].add("assistant", cached)
+            yield cached
+            return
+        parts = []
+        try:
+            async for token in llm.stream(messages):
+                parts.append(token)
+                yield token
+        except Exception:
+            yield "\n\nI apologize, but I encountered an error processing your message. Please try again or rephrase your question."
+            return
+        conversations[request.user_id].add("assistant", "".join(parts))
+        if shared is not None:
+            shared.put(request.message, "".join(parts), request.context)
+    
+    return StreamingResponse(tokens(), media_type="text/plain; charset=utf-8")
+
 @app.post("/chat/reset")
 def reset_conversation(user_id: str):
     """Reset conversation history for a user"""
-    if user_id in conversations:
-        conversations[user_id] = []
+    conversations.pop(user_id, None)
     return {"status": "success", "message": "Conversation reset"}
 
 @app.get("/chat/history/{user_id}")
@@ -295,8 +354,8 @@ def get_history(user_id: str):
     """Get conversation history for a user"""
     return {
         "user_id": user_id,
-        "history": conversations.get(user_id, []),
-        "message_count": len(conversations.get(user_id, []))
+        "history": conversations[user_id].history() if user_id in conversations else [],
+        "message_count": len(conversations[user_id].turns) if user_id in conversations else 0
     }
 
 # Keep your existing RL endpoints
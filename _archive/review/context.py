@@ -0,0 +1,148 @@
+"""Token-budgeted prompt assembly for chat conversations
+
+Each turn's token count is computed once, when the turn is stored, so
+building a prompt only sums cached counts newest-first until the budget
+is used. Turns that no longer fit are folded into a rolling summary
+(or dropped, with summaries off), which keeps long chats bounded
+without hard failures.
+"""
+import os
+import re
+from collections import deque
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional
+
+# Chat formats spend a few tokens per message on role and separators
+MESSAGE_OVERHEAD = 4
+SUMMARY_HEADER = "Summary of earlier conversation:\n"
+
+try:
+    import tiktoken
+
+    _encoding = tiktoken.get_encoding("cl100k_base")
+
+    def count_tokens(text: str) -> int:
+        return len(_encoding.encode(text))
+
+    def truncate(text: str, tokens: int) -> str:
+        return _encoding.decode(_encoding.encode(text)[:max(tokens, 0)])
+except ImportError:
+    _PIECES = re.compile(r"\w{1,4}|[^\w\s]|\s+")
+
+    def count_tokens(text: str) -> int:
+        """Approximation: words split into 4-character pieces, punctuation separate"""
+        return sum(1 for piece in _PIECES.findall(text) if not piece.isspace())
+
+    def truncate(text: str, tokens: int) -> str:
+        count = 0
+        for match in _PIECES.finditer(text):
+            if not match.group().isspace():
+                count += 1
+                if count > tokens:
+                    return text[:match.start()].rstrip()
+        return text
+
+
+@lru_cache(maxsize=16)
+def _prompt_tokens(text: str) -> int:
+    return count_tokens(text) + MESSAGE_OVERHEAD
+
+
+class Turn:
+    __slots__ = ("role", "content", "tokens")
+
+    def __init__(self, role: str, content: str):
+        self.role = role
+        self.content = content
+        self.tokens = count_tokens(content) + MESSAGE_OVERHEAD
+
+
+def extractive_summary(summary: str, turns: List[Turn], max_tokens: int) -> str:
+    """Default summarizer: first sentence of each folded user turn
+
+    Incremental: only the newly folded turns are read. The oldest lines
+    are dropped once the summary exceeds max_tokens.
+    """
+    lines = summary.splitlines() if summary else []
+    for turn in turns:
+        if turn.role == "user":
+            first = re.split(r"(?<=[.!?])\s", turn.content.strip(), maxsplit=1)[0]
+            lines.append(f"- {truncate(first, 40)}")
+    while lines and count_tokens("\n".join(lines)) > max_tokens:
+        lines.pop(0)
+    return "\n".join(lines)
+
+
+class Conversation:
+    """Stored turns plus a rolling summary of the ones that were folded away"""
+
+    def __init__(self, budget: int = 3000, summary_tokens: int = 300,
+                 summarizer: Optional[Callable[[str, List[Turn], int], str]] = extractive_summary):
+        self.budget = budget
+        self.summary_tokens = summary_tokens
+        self.summarizer = summarizer
+        self.turns = deque()
+        self.tokens = 0
+        self.summary = ""
+        self.summary_message = None
+
+    def add(self, role: str, content: str):
+        turn = Turn(role, content)
+        self.turns.append(turn)
+        self.tokens += turn.tokens
+        # Stored turns never need to exceed one prompt's worth
+        self._fold(self.budget)
+
+    def _fold(self, limit: int, summary_tokens: Optional[int] = None) -> bool:
+        """Move the oldest turns into the summary until the rest fit in limit"""
+        folded = []
+        while len(self.turns) > 1 and self.tokens > limit:
+            old = self.turns.popleft()
+            self.tokens -= old.tokens
+            folded.append(old)
+        if folded and self.summarizer is not None:
+            self._summarize(folded, self.summary_tokens if summary_tokens is None else summary_tokens)
+        return bool(folded)
+
+    def _summarize(self, folded: List[Turn], max_tokens: int):
+        self.summary = self.summarizer(self.summary, folded, max(max_tokens, 0))
+        self.summary_message = Turn("system", f"{SUMMARY_HEADER}{self.summary}")
+
+    def build(self, system_prompt: str, budget: Optional[int] = None) -> List[Dict[str, str]]:
+        """System prompt, summary, then the stored turns
+
+        Turns that do not fit next to the system prompt and summary are
+        folded into the summary first, so none is silently left out. The
+        summary is shortened before the newest turn is.
+        """
+        budget = budget or self.budget
+        room = budget - _prompt_tokens(system_prompt)
+        summary_cap = self.summary_tokens
+        if self.summarizer is not None and self.turns:
+            summary_cap = min(summary_cap, room - self.turns[-1].tokens - _prompt_tokens(SUMMARY_HEADER))
+            if self.summary and count_tokens(self.summary) > summary_cap:
+                self._summarize([], summary_cap)
+        # Folding can grow the summary, which may push out another turn
+        while self._fold(room - (self.summary_message.tokens if self.summary else 0), summary_cap):
+            pass
+
+        messages = [{"role": "system", "content": system_prompt}]
+        if self.summary:
+            messages.append({"role": "system", "content": self.summary_message.content})
+            room -= self.summary_message.tokens
+        if len(self.turns) == 1 and self.tokens > room:
+            # The newest turn alone is too long: send its start
+            turn = self.turns[0]
+            return messages + [{"role": turn.role, "content": truncate(turn.content, room - MESSAGE_OVERHEAD)}]
+        return messages + self.history()
+
+    def history(self) -> List[Dict[str, str]]:
+        return [{"role": turn.role, "content": turn.content} for turn in self.turns]
+
+
+def new_conversation() -> Conversation:
+    return Conversation(
+        budget=int(os.getenv("CONTEXT_TOKEN_BUDGET", "3000")),
+        summary_tokens=int(os.getenv("CONTEXT_SUMMARY_TOKENS", "300")),
+        summarizer=extractive_summary if os.getenv("CONTEXT_SUMMARY", "1") == "1" else None
+    )
@@ -0,0 +1,216 @@
+"""Pluggable async LLM providers for the /message endpoint
+
+    llm = LLMClient(make_provider())
+    reply = await llm.complete(messages)
+    async for token in llm.stream(messages): ...
+
+LLM_PROVIDER picks "openai" (AsyncOpenAI, needs the openai package and
+OPENAI_API_KEY) or "fake" (deterministic local replies with configurable
+latency, for offline load tests). LLMClient adds the concurrency bound,
+per-request deadline and retries on top of any provider.
+"""
+import asyncio
+import os
+import random
+import re
+from abc import ABC, abstractmethod
+from typing import AsyncIterator, Callable, Dict, List, Optional
+
+Messages = List[Dict[str, str]]
+
+
+class LLMError(Exception):
+    pass
+
+
+class LLMTimeout(LLMError):
+    pass
+
+
+class LLMProvider(ABC):
+    name = "base"
+
+    @abstractmethod
+    def stream(self, messages: Messages) -> AsyncIterator[str]:
+        """Async generator of reply tokens"""
+
+    def retryable(self, error: Exception) -> bool:
+        return False
+
+    async def close(self):
+        pass
+
+
+class OpenAIProvider(LLMProvider):
+    """Chat completions over one pooled AsyncOpenAI client"""
+
+    name = "openai"
+
+    def __init__(self, model: str = "gpt-3.5-turbo", temperature: float = 0.7, max_tokens: int = 500,
+                 api_key: Optional[str] = None):
+        import openai
+
+        self.openai = openai
+        # Retries and timeouts are handled by LLMClient
+        self.client = openai.AsyncOpenAI(api_key=api_key or os.getenv("OPENAI_API_KEY"), max_retries=0)
+        self.model = model
+        self.temperature = temperature
+        self.max_tokens = max_tokens
+
+    async def stream(self, messages: Messages) -> AsyncIterator[str]:
+        response = await self.client.chat.completions.create(
+            model=self.model,
+            messages=messages,
+            temperature=self.temperature,
+            max_tokens=self.max_tokens,
+            stream=True
+        )
+        async for chunk in response:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+
+    def retryable(self, error: Exception) -> bool:
+        return isinstance(error, (
+            self.openai.APITimeoutError,
+            self.openai.APIConnectionError,
+            self.openai.RateLimitError,
+            self.openai.InternalServerError
+        ))
+
+    async def close(self):
+        await self.client.close()
+
+
+class FakeProvider(LLMProvider):
+    """Deterministic local provider for offline runs and load tests
+
+    The reply comes from `responder(last_user_message, messages)` (an echo
+    by default) and is streamed word by word after `latency` seconds,
+    with `token_delay` seconds between words.
+    """
+
+    name = "fake"
+
+    def __init__(self, latency: float = 0.0, token_delay: float = 0.0,
+                 responder: Optional[Callable[[str, Messages], str]] = None):
+        self.latency = latency
+        self.token_delay = token_delay
+        self.responder = responder or (lambda text, messages: f"You said: {text}")
+
+    async def stream(self, messages: Messages) -> AsyncIterator[str]:
+        text = next((m["content"] for m in reversed(messages) if m["role"] == "user"), "")
+        reply = self.responder(text, messages)
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        for i, token in enumerate(re.findall(r"\S+\s*|\s+", reply)):
+            if self.token_delay and i:
+                await asyncio.sleep(self.token_delay)
+            yield token
+
+
+class LLMClient:
+    """Bounded, deadline-limited, retrying access to one provider
+
+    At most `max_concurrency` completions run at once; others wait for a
+    slot. `timeout` covers the whole request including that wait.
+    Failures the provider marks retryable are retried with full-jitter
+    exponential backoff, but only before the first token was yielded.
+    """
+
+    def __init__(self, provider: LLMProvider, max_concurrency: int = 32, timeout: float = 30.0,
+                 retries: int = 2, backoff: float = 0.5):
+        self.provider = provider
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.active = 0
+        self.completed = 0
+        self.failed = 0
+        self.retried = 0
+
+    async def stream(self, messages: Messages) -> AsyncIterator[str]:
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.timeout
+
+        def remaining():
+            left = deadline - loop.time()
+            if left <= 0:
+                raise LLMTimeout(f"No completion within {self.timeout}s")
+            return left
+
+        try:
+            await asyncio.wait_for(self.semaphore.acquire(), remaining())
+        except asyncio.TimeoutError:
+            raise LLMTimeout(f"No completion slot within {self.timeout}s")
+        self.active += 1
+        try:
+            attempt = 0
+            while True:
+                started = False
+                tokens = self.provider.stream(messages)
+                try:
+                    while True:
+                        try:
+                            token = await asyncio.wait_for(tokens.__anext__(), remaining())
+                        except StopAsyncIteration:
+                            break
+                        started = True
+                        yield token
+                    self.completed += 1
+                    return
+                except asyncio.TimeoutError:
+                    self.failed += 1
+                    raise LLMTimeout(f"No completion within {self.timeout}s")
+                except Exception as e:
+                    if started or attempt >= self.retries or not self.provider.retryable(e):
+                        self.failed += 1
+                        raise
+                    attempt += 1
+                    self.retried += 1
+                    await asyncio.sleep(min(random.uniform(0, self.backoff * 2 ** attempt), remaining()))
+                finally:
+                    await tokens.aclose()
+        finally:
+            self.active -= 1
+            self.semaphore.release()
+
+    async def complete(self, messages: Messages) -> str:
+        return "".join([token async for token in self.stream(messages)])
+
+    def metrics(self):
+        return {
+            "provider": self.provider.name,
+            "active": self.active,
+            "completed": self.completed,
+            "failed": self.failed,
+            "retried": self.retried
+        }
+
+
+def make_provider(responder=None) -> LLMProvider:
+    """Provider from LLM_PROVIDER; defaults to openai only when a key is configured"""
+    name = os.getenv("LLM_PROVIDER", "openai" if os.getenv("OPENAI_API_KEY") else "fake")
+    if name == "openai":
+        return OpenAIProvider(
+            model=os.getenv("LLM_MODEL", "gpt-3.5-turbo"),
+            temperature=float(os.getenv("LLM_TEMPERATURE", "0.7")),
+            max_tokens=int(os.getenv("LLM_MAX_TOKENS", "500"))
+        )
+    if name == "fake":
+        return FakeProvider(
+            latency=float(os.getenv("LLM_FAKE_LATENCY_MS", "0")) / 1000,
+            token_delay=float(os.getenv("LLM_FAKE_TOKEN_MS", "0")) / 1000,
+            responder=responder
+        )
+    raise ValueError(f"Unknown LLM_PROVIDER {name!r}")
+
+
+def make_client(responder=None) -> LLMClient:
+    return LLMClient(
+        make_provider(responder),
+        max_concurrency=int(os.getenv("LLM_MAX_CONCURRENCY", "32")),
+        timeout=float(os.getenv("LLM_TIMEOUT", "30")),
+        retries=int(os.getenv("LLM_RETRIES", "2")),
+        backoff=float(os.getenv("LLM_RETRY_BACKOFF", "0.5"))
+    )
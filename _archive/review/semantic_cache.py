@@ -0,0 +1,196 @@
+"""Semantic response cache in front of the LLM provider
+
+Queries are embedded locally (feature-hashed, lightly stemmed content
+words, L2-normalized) into rows of a preallocated NumPy matrix. A lookup
+is one matrix-vector product over the rows in the same scope (the
+relevant profile fields, matched exactly) with the same number of
+distinct terms; the best row above the similarity threshold is a hit.
+Unweighted bag-of-words cosines are high for a one-word difference
+(2/sqrt(6) = 0.82 for two terms versus three), so the threshold is
+strict and a query that adds a specific term never matches. Entries expire after a TTL and the least
+recently used ones are evicted to stay within the entry and byte caps.
+
+Queries with fewer than min_terms content words are never cached, and
+the app only consults the cache on a conversation's first turn, since
+later answers depend on the history.
+"""
+import os
+import re
+import threading
+import time
+import zlib
+from typing import Optional
+
+import numpy as np
+
+STOPWORDS = frozenset("""
+a an the i me my we you your to of for in on at by with and or but is are was were be been am do does did
+how what which who whom can could should would will shall may might please tell about it its this that these
+those there here so as if then than just any some into from up out get
+""".split())
+
+
+def normalize(text: str):
+    words = re.findall(r"[a-z0-9+#]+", text.lower())
+    terms = []
+    for word in words:
+        if word in STOPWORDS:
+            continue
+        for suffix in ("ing", "ed", "es", "s"):
+            if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+                word = word[:-len(suffix)]
+                break
+        terms.append(word)
+    return terms
+
+
+def embed(text: str, dim: int = 256) -> np.ndarray:
+    """Signed feature-hashing embedding of the normalized query"""
+    return embed_terms(normalize(text), dim)
+
+
+def embed_terms(terms, dim: int = 256) -> np.ndarray:
+    vector = np.zeros(dim, dtype=np.float32)
+    for term in terms:
+        h = zlib.crc32(term.encode())
+        vector[h % dim] += 1.0 if (h >> 31) & 1 else -1.0
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+def scope_key(*fields) -> int:
+    return zlib.crc32("\x1f".join("" if f is None else str(f) for f in fields).encode())
+
+
+class SemanticCache:
+    def __init__(self, threshold: float = 0.95, ttl: float = 86400, max_entries: int = 10000,
+                 max_bytes: int = 64 * 1024 * 1024, dim: int = 256, min_terms: int = 2):
+        self.threshold = threshold
+        # Shorter queries ("yes", "tell me more") only make sense in context
+        self.min_terms = min_terms
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.dim = dim
+        self.vectors = np.zeros((max_entries, dim), dtype=np.float32)
+        self.scopes = np.zeros(max_entries, dtype=np.int64)
+        self.term_counts = np.zeros(max_entries, dtype=np.int32)
+        self.expires = np.zeros(max_entries, dtype=np.float64)
+        self.last_used = np.zeros(max_entries, dtype=np.float64)
+        self.valid = np.zeros(max_entries, dtype=bool)
+        self.answers = [None] * max_entries
+        self.sizes = np.zeros(max_entries, dtype=np.int64)
+        self.bytes = 0
+        self.lock = threading.Lock()
+        self.lookups = 0
+        self.hits = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def _best(self, vector, terms, scope, now):
+        live = self.valid & (self.expires > now)
+        expired = self.valid & ~live
+        if expired.any():
+            for slot in np.flatnonzero(expired):
+                self._drop(slot)
+            self.expirations += int(expired.sum())
+        candidates = np.flatnonzero(live & (self.scopes == scope) & (self.term_counts == terms))
+        if not len(candidates):
+            return None, 0.0
+        similarity = self.vectors[candidates] @ vector
+        best = int(np.argmax(similarity))
+        return int(candidates[best]), float(similarity[best])
+
+    def _vector(self, query: str):
+        """(embedding, distinct term count), or (None, 0) for queries too short to cache"""
+        terms = normalize(query)
+        if len(terms) < self.min_terms:
+            return None, 0
+        vector = embed_terms(terms, self.dim)
+        return (vector, len(set(terms))) if vector.any() else (None, 0)
+
+    def get(self, query: str, *profile) -> Optional[str]:
+        vector, terms = self._vector(query)
+        with self.lock:
+            now = time.time()
+            self.lookups += 1
+            if vector is None:
+                return None
+            slot, similarity = self._best(vector, terms, scope_key(*profile), now)
+            if slot is None or similarity < self.threshold:
+                return None
+            self.hits += 1
+            self.last_used[slot] = now
+            return self.answers[slot]
+
+    def put(self, query: str, answer: str, *profile):
+        vector, terms = self._vector(query)
+        if vector is None:
+            return
+        size = len(answer.encode()) + vector.nbytes
+        if size > self.max_bytes:
+            return
+        scope = scope_key(*profile)
+        with self.lock:
+            now = time.time()
+            slot, similarity = self._best(vector, terms, scope, now)
+            if slot is not None and similarity >= self.threshold:
+                # Refresh the near-duplicate instead of adding another row
+                self._drop(slot)
+            else:
+                free = np.flatnonzero(~self.valid)
+                slot = int(free[0]) if len(free) else self._evict()
+            while self.bytes + size > self.max_bytes and self.valid.any():
+                self._evict()
+            self.vectors[slot] = vector
+            self.scopes[slot] = scope
+            self.term_counts[slot] = terms
+            self.expires[slot] = now + self.ttl
+            self.last_used[slot] = now
+            self.valid[slot] = True
+            self.answers[slot] = answer
+            self.sizes[slot] = size
+            self.bytes += size
+
+    def _evict(self) -> int:
+        used = np.where(self.valid, self.last_used, np.inf)
+        slot = int(np.argmin(used))
+        self._drop(slot)
+        self.evictions += 1
+        return slot
+
+    def _drop(self, slot):
+        if self.valid[slot]:
+            self.valid[slot] = False
+            self.answers[slot] = None
+            self.bytes -= int(self.sizes[slot])
+            self.sizes[slot] = 0
+
+    def clear(self):
+        with self.lock:
+            for slot in np.flatnonzero(self.valid):
+                self._drop(slot)
+
+    def metrics(self):
+        return {
+            "entries": int(self.valid.sum()),
+            "bytes": self.bytes,
+            "lookups": self.lookups,
+            "hits": self.hits,
+            "hit_rate": self.hits / self.lookups if self.lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "threshold": self.threshold
+        }
+
+
+def make_cache() -> Optional[SemanticCache]:
+    if os.getenv("SEMANTIC_CACHE", "1") != "1":
+        return None
+    return SemanticCache(
+        threshold=float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.95")),
+        ttl=float(os.getenv("SEMANTIC_CACHE_TTL_SECONDS", "86400")),
+        max_entries=int(os.getenv("SEMANTIC_CACHE_MAX_ENTRIES", "10000")),
+        max_bytes=int(os.getenv("SEMANTIC_CACHE_MAX_BYTES", str(64 * 1024 * 1024))),
+        min_terms=int(os.getenv("SEMANTIC_CACHE_MIN_TERMS", "2"))
+    )
@@ -0,0 +1,22 @@
+from semantic_cache import SemanticCache
+
+
+def test_rephrased_query_hits():
+    cache = SemanticCache(max_entries=16)
+    cache.put("How do I learn Python programming?", "answer")
+    assert cache.get("how can I learn python programming") == "answer"
+
+
+def test_extra_specific_term_misses():
+    cache = SemanticCache(max_entries=16)
+    cache.put("how do I learn python", "answer")
+    assert cache.get("how do I learn python") == "answer"
+    for query in ("how do I learn python decorators", "how do I learn python testing",
+                  "how do I learn python for kids"):
+        assert cache.get(query) is None
+
+
+def test_short_queries_are_not_cached():
+    cache = SemanticCache(max_entries=16)
+    cache.put("tell me more", "answer")
+    assert cache.get("tell me more") is None
@@ -1,6 +1,9 @@
 from aclsa.core.agent_base import AgentBase
 
 class EthicsAgent(AgentBase):
+    reads = ("input",)
+    writes = ("response",)
+
     def __init__(self):
         super().__init__("EthicsAgent")
 
@@ -1,6 +1,9 @@
 from aclsa.core.agent_base import AgentBase
 
 class MemoryAgent(AgentBase):
+    reads = ("user_id", "input")
+    writes = ("memory",)
+
     def __init__(self):
         super().__init__("MemoryAgent")
         self.store = {}
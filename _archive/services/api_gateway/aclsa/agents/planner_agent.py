@@ -1,6 +1,9 @@
 from aclsa.core.agent_base import AgentBase
 
 class PlannerAgent(AgentBase):
+    reads = ("input",)
+    writes = ("plan",)
+
     def __init__(self):
         super().__init__("PlannerAgent")
 
@@ -1,6 +1,9 @@
 from aclsa.core.agent_base import AgentBase
 
 class RLAgent(AgentBase):
+    reads = ("state", "plan")
+    writes = ()
+
     def __init__(self):
         super().__init__("RLAgent")
 
@@ -1,6 +1,9 @@
 from aclsa.core.agent_base import AgentBase
 
 class StateAgent(AgentBase):
+    reads = ("memory",)
+    writes = ("state",)
+
     def __init__(self):
         super().__init__("StateAgent")
 
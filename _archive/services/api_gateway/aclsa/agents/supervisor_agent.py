@@ -1,8 +1,12 @@
+import asyncio
 from aclsa.agents.planner_agent import PlannerAgent
 from aclsa.agents.memory_agent import MemoryAgent
 from aclsa.agents.ethics_agent import EthicsAgent
 from aclsa.agents.state_agent import StateAgent
 from aclsa.agents.rl_agent import RLAgent
+from aclsa.core.agent_graph import AgentGraph, Step
+
+ASK_EMAIL = "Before I continue, can you share your email?"
 
 class SupervisorAgent:
     def __init__(self):
@@ -12,19 +16,24 @@ class SupervisorAgent:
         self.state = StateAgent()
         self.rl = RLAgent()
 
-    def run(self, context):
-        context = self.memory.run(context)
-        context = self.ethics.run(context)
-
-        if context.response:
-            return context.response
-
-        context = self.state.run(context)
+        # Dependencies come from each agent's reads/writes: memory, ethics
+        # and planner start together, state waits for memory, rl for both
+        # state and planner
+        self.graph = AgentGraph([
+            Step(self.memory),
+            Step(self.ethics, stop=lambda c: c.response),
+            Step(self.state, stop=lambda c: ASK_EMAIL if c.state.get("needs_email") else None),
+            Step(self.planner),
+            Step(self.rl),
+        ])
 
-        if context.state.get("needs_email"):
-            return "Before I continue, can you share your email?"
-
-        context = self.planner.run(context)
+    async def arun(self, context):
+        reply = await self.graph.run(context)
+        if reply:
+            return reply
 
         context.response = f"I understood your problem: '{context.input}'. I will solve it step by step."
         return context.response
+
+    def run(self, context):
+        return asyncio.run(self.arun(context))
@@ -1,13 +1,146 @@
-DIALOG = {}
+import heapq
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+class MemoryDialogStore:
+    """Per-process dialog state with TTL expiry and an LRU cap
+
+    Expiry uses a heap of (expires_at, user_id); entries overwritten since
+    are skipped when popped, and the heap is rebuilt once stale entries
+    dominate, so expiry stays amortized O(log n) per write.
+    """
+
+    def __init__(self, ttl: float = 3600, max_entries: int = 100000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.expiry = []
+        self.lock = threading.Lock()
+        self.expired = 0
+        self.evicted = 0
+
+    def get(self, user_id):
+        with self.lock:
+            self._expire(time.monotonic())
+            entry = self.entries.get(user_id)
+            if entry is None:
+                return None
+            self.entries.move_to_end(user_id)
+            return entry[0]
+
+    def set(self, user_id, state):
+        with self.lock:
+            now = time.monotonic()
+            self._expire(now)
+            expires_at = now + self.ttl
+            self.entries[user_id] = (state, expires_at)
+            self.entries.move_to_end(user_id)
+            heapq.heappush(self.expiry, (expires_at, user_id))
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.evicted += 1
+            if len(self.expiry) > 2 * len(self.entries) + 64:
+                self.expiry = [(exp, uid) for uid, (_, exp) in self.entries.items()]
+                heapq.heapify(self.expiry)
+
+    def delete(self, user_id):
+        with self.lock:
+            self.entries.pop(user_id, None)
+
+    def _expire(self, now):
+        while self.expiry and self.expiry[0][0] <= now:
+            expires_at, user_id = heapq.heappop(self.expiry)
+            entry = self.entries.get(user_id)
+            if entry is not None and entry[1] == expires_at:
+                del self.entries[user_id]
+                self.expired += 1
+
+    def stats(self):
+        return {"backend": "memory", "entries": len(self.entries), "expired": self.expired, "evicted": self.evicted}
+
+
+class SQLiteDialogStore:
+    """Dialog state in a SQLite file shared by every gateway worker on the host
+
+    Expired rows are invisible to reads and purged every `purge_every`
+    writes, which also trims the table to max_entries by oldest write.
+    """
+
+    def __init__(self, path: str, ttl: float = 3600, max_entries: int = 100000, purge_every: int = 1000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.purge_every = purge_every
+        self.writes = 0
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, timeout=5, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS dialog ("
+            "user_id TEXT PRIMARY KEY, state TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS dialog_expires ON dialog (expires_at)")
+
+    def get(self, user_id):
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT state FROM dialog WHERE user_id = ? AND expires_at > ?", (user_id, time.time())
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def set(self, user_id, state):
+        with self.lock:
+            self.conn.execute(
+                "INSERT INTO dialog (user_id, state, expires_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(user_id) DO UPDATE SET state = excluded.state, expires_at = excluded.expires_at",
+                (user_id, json.dumps(state), time.time() + self.ttl)
+            )
+            self.writes += 1
+            if self.writes % self.purge_every == 0:
+                self._purge()
+
+    def delete(self, user_id):
+        with self.lock:
+            self.conn.execute("DELETE FROM dialog WHERE user_id = ?", (user_id,))
+
+    def _purge(self):
+        self.conn.execute("DELETE FROM dialog WHERE expires_at <= ?", (time.time(),))
+        self.conn.execute(
+            "DELETE FROM dialog WHERE user_id IN ("
+            "SELECT user_id FROM dialog ORDER BY expires_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,)
+        )
+
+    def stats(self):
+        with self.lock:
+            entries = self.conn.execute("SELECT COUNT(*) FROM dialog").fetchone()[0]
+        return {"backend": "sqlite", "entries": entries}
+
+
+def make_store():
+    ttl = float(os.getenv("DIALOG_TTL_SECONDS", "3600"))
+    max_entries = int(os.getenv("DIALOG_MAX_ENTRIES", "100000"))
+    if os.getenv("DIALOG_BACKEND", "memory") == "sqlite":
+        return SQLiteDialogStore(os.getenv("DIALOG_SQLITE_PATH", "dialog_state.db"), ttl, max_entries)
+    return MemoryDialogStore(ttl, max_entries)
+
+
+DIALOG = make_store()
 
 def get_state(user_id):
-    return DIALOG.get(user_id, {"phase": "NEW", "missing": []})
+    state = DIALOG.get(user_id)
+    return state if state is not None else {"phase": "NEW", "missing": []}
 
 def set_state(user_id, phase, missing=None):
-    DIALOG[user_id] = {
+    DIALOG.set(user_id, {
         "phase": phase,
         "missing": missing or []
-    }
+    })
 
 def clear_state(user_id):
-    DIALOG.pop(user_id, None)
+    DIALOG.delete(user_id)
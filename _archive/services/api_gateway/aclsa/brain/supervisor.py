@@ -1,9 +1,69 @@
+import json
+import os
 import re
-import httpx
+from typing import Optional
+from aclsa.core.batching import MicroBatcher, SingleFlight
+from aclsa.core.downstream import clients
+from aclsa.core.fanout import fan_out
+from aclsa.core.resilience import CircuitOpenError
+from aclsa.core.scheduler import TierScheduler
+from aclsa.core.telemetry import span
 
-MEMORY_URL = "http://memory:8002/memory/store"
-PLANNING_URL = "http://planning:8003/planning/simulate"
-RL_URL = "http://rl:8004/rl/decide"
+MEMORY_PATH = "/memory/store"
+PLANNING_PATH = "/planning/simulate"
+RL_PATH = "/rl/decide"
+RL_BATCH_PATH = "/rl/decide_batch"
+
+# Full-agent fan-out: overall deadline plus per-part timeouts (seconds)
+FANOUT_DEADLINE = float(os.getenv("FANOUT_DEADLINE", "3.0"))
+PART_TIMEOUTS = {
+    "plan": float(os.getenv("PLANNING_TIMEOUT", "2.5")),
+    "decision": float(os.getenv("RL_TIMEOUT", "1.0")),
+}
+
+# Concurrent RL decisions are sent as one /rl/decide_batch call; identical
+# in-flight planning simulations share one call
+RL_BATCHING = os.getenv("RL_BATCHING", "1") == "1"
+RL_BATCH_WINDOW = float(os.getenv("RL_BATCH_WINDOW_MS", "2")) / 1000
+RL_BATCH_MAX = int(os.getenv("RL_BATCH_MAX", "64"))
+
+
+async def decide_batch(items):
+    try:
+        # Batch compositions never repeat, so only per-item fallbacks are stored (below)
+        body = await clients.post("rl", RL_BATCH_PATH, json={"requests": items, "detail": True})
+    except CircuitOpenError as e:
+        # Serve each item's last good single decision, like a direct call would
+        results = []
+        for item in items:
+            cached = clients.fallbacks.get(clients.request_key("rl", RL_PATH, item))
+            results.append(e if cached is None else {**cached, "stale": True})
+        return results
+    for item, decision in zip(items, body["decisions"]):
+        clients.fallbacks.put(clients.request_key("rl", RL_PATH, item), decision)
+    return body["decisions"]
+
+
+scheduler = TierScheduler()
+rl_batcher = MicroBatcher(decide_batch, window=RL_BATCH_WINDOW, max_items=RL_BATCH_MAX)
+planning_flight = SingleFlight()
+
+
+def decide(payload):
+    if RL_BATCHING:
+        return rl_batcher.submit(payload)
+    return clients.post("rl", RL_PATH, json=payload, cache=True)
+
+
+def simulate(payload):
+    return planning_flight.do(
+        json.dumps(payload, sort_keys=True),
+        lambda: clients.post("planning", PLANNING_PATH, json=payload, hedge=True, cache=True)
+    )
+
+
+def batching_metrics():
+    return {"rl": rl_batcher.metrics(), "planning": planning_flight.metrics()}
 
 SMALL_TALK = {
     "hi", "hii", "hello", "hey", "ok", "okay", "hmm", "thanks", "thank you"
@@ -11,53 +71,108 @@ SMALL_TALK = {
 
 EMAIL_REGEX = r"[^@]+@[^@]+\.[^@]+"
 
-async def handle_message(user_id: str, text: str):
-    t = text.lower().strip()
+def parse_fields(fields: Optional[str]):
+    """"plan.statistics,decision" -> {"plan": ["statistics"], "decision": None}
 
-    # 1️⃣ SMALL TALK → CHAT ONLY
-    if t in SMALL_TALK:
-        return "Hello! How can I help you today?"
+    None means the whole response. A part mapped to None is returned
+    whole; parts not named are not requested downstream at all.
+    """
+    if not fields:
+        return None
+    parts = {}
+    for field in fields.split(","):
+        part, _, key = field.strip().partition(".")
+        if part not in ("plan", "decision"):
+            continue
+        if not key or parts.get(part, []) is None:
+            parts[part] = None
+        else:
+            parts.setdefault(part, []).append(key)
+    return parts
 
-    # 2️⃣ EMAIL
+def classify(t: str) -> str:
+    """Scheduler tier for a normalized message"""
+    if t in SMALL_TALK:
+        return "fast"
     if re.fullmatch(EMAIL_REGEX, t):
-        async with httpx.AsyncClient() as client:
-            await client.post(
-                MEMORY_URL,
-                json={
-                    "user_id": user_id,
-                    "content": t,
-                    "memory_type": "email",
-                    "importance": 1.0
-                }
-            )
-        return "Thanks. What is your main goal?"
-
-    # 3️⃣ VERY SHORT INPUT
+        return "light"
     if len(t.split()) < 3:
-        return "Please tell me a bit more so I can help properly."
-
-    # 4️⃣ FULL AGENT MODE (ONLY HERE)
-    async with httpx.AsyncClient() as client:
-        plan = await client.post(
-            PLANNING_URL,
-            json={"user_id": user_id, "horizon_days": 90}
-        )
-        decision = await client.post(
-            RL_URL,
-            json={
-                "user_id": user_id,
-                "current_state": {
-                    "energy": 0.7,
-                    "skills_ready": True
-                }
-            }
-        )
-
-    return {
-        "summary": "I’ve analyzed your situation and created a plan with a recommended next action.",
-        "plan": plan.json(),
-        "decision": decision.json()
+        return "fast"
+    return "heavy"
+
+async def handle_message(user_id: str, text: str, fields: Optional[str] = None):
+    """Raises Overloaded when the heavy tier is shedding load
+
+    fields (e.g. "plan.statistics,decision.recommended_action") trims the
+    full-agent response; the projection is passed on to the services.
+    """
+    t = text.lower().strip()
+    tier = classify(t)
+
+    async with scheduler.slot(tier):
+        # 1️⃣ SMALL TALK → CHAT ONLY
+        if t in SMALL_TALK:
+            return "Hello! How can I help you today?"
+
+        # 2️⃣ EMAIL
+        if tier == "light":
+            try:
+                await clients.post(
+                    "memory",
+                    MEMORY_PATH,
+                    json={
+                        "user_id": user_id,
+                        "content": t,
+                        "memory_type": "email",
+                        "importance": 1.0
+                    }
+                )
+            except CircuitOpenError:
+                # The write was not sent; don't claim it was
+                return "Sorry, I couldn't save that right now. Please send it again in a moment."
+            return "Thanks. What is your main goal?"
+
+        # 3️⃣ VERY SHORT INPUT
+        if tier == "fast":
+            return "Please tell me a bit more so I can help properly."
+
+        # 4️⃣ FULL AGENT MODE (ONLY HERE)
+        return await full_agent(user_id, parse_fields(fields))
+
+async def full_agent(user_id: str, parts=None):
+    plan_request = {"user_id": user_id, "horizon_days": 90}
+    decision_request = {
+        "user_id": user_id,
+        "current_state": {
+            "energy": 0.7,
+            "skills_ready": True
+        }
     }
+    calls = {
+        "plan": lambda: simulate(plan_request),
+        "decision": lambda: decide(decision_request),
+    }
+    if parts is not None:
+        calls = {name: call for name, call in calls.items() if name in parts}
+        if parts.get("plan"):
+            plan_request["fields"] = parts["plan"]
+        if parts.get("decision"):
+            decision_request["fields"] = parts["decision"]
+
+    with span("fan_out", parts=",".join(calls)):
+        results, degraded = await fan_out(calls, deadline=FANOUT_DEADLINE, timeouts=PART_TIMEOUTS)
+
+    for name, part in results.items():
+        if part.get("stale"):
+            degraded[name] = "stale"
 
+    if degraded:
+        summary = "I’ve analyzed your situation, but some parts of the analysis are unavailable right now."
+    else:
+        summary = "I’ve analyzed your situation and created a plan with a recommended next action."
 
-                   
+    response = {"summary": summary}
+    for name in calls:
+        response[name] = results.get(name)
+    response["degraded"] = degraded
+    return response
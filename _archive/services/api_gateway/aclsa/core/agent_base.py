@@ -1,9 +1,18 @@
 from abc import ABC, abstractmethod
 
 class AgentBase(ABC):
+    # Context fields the agent reads and writes; the supervisor orders
+    # agents from these
+    reads = ()
+    writes = ()
+
     def __init__(self, name: str):
         self.name = name
 
     @abstractmethod
     def run(self, context: dict):
         pass
+
+    async def arun(self, context):
+        """Async entry point; agents doing I/O override this"""
+        return self.run(context)
@@ -0,0 +1,63 @@
+import asyncio
+from typing import Callable, List, Optional
+
+
+class Step:
+    def __init__(self, agent, stop: Optional[Callable] = None):
+        self.agent = agent
+        # Called with the context once the agent finishes; a truthy
+        # return value is the reply that ends the run early
+        self.stop = stop
+
+
+class AgentGraph:
+    """Runs agents as a DAG derived from the Context fields they touch
+
+    A step depends on every earlier step that writes a field it reads or
+    writes, or that reads a field it writes, and starts as soon as those
+    are done, so independent agents run concurrently. When a stop predicate fires, pending steps are
+    cancelled; earlier-declared stops still take precedence.
+    """
+
+    def __init__(self, steps: List[Step]):
+        self.steps = steps
+        self.deps = []
+        for i, step in enumerate(steps):
+            touches = set(step.agent.reads) | set(step.agent.writes)
+            writes = set(step.agent.writes)
+            self.deps.append({
+                j for j in range(i)
+                if touches & set(steps[j].agent.writes) or writes & set(steps[j].agent.reads)
+            })
+
+    async def run(self, context):
+        """Returns the short-circuit reply, or None once every step has run"""
+        tasks = {}
+        done = set()
+        stopped = {}
+        try:
+            while len(done) < len(self.steps):
+                for i, step in enumerate(self.steps):
+                    if i not in tasks and self.deps[i] <= done:
+                        tasks[i] = asyncio.ensure_future(step.agent.arun(context))
+                running = {task: i for i, task in tasks.items() if i not in done}
+                finished, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for task in finished:
+                    i = running[task]
+                    task.result()
+                    done.add(i)
+                    stop = self.steps[i].stop
+                    reply = stop(context) if stop else None
+                    if reply:
+                        stopped[i] = reply
+                if stopped:
+                    first = min(stopped)
+                    if all(j in done for j in range(first) if self.steps[j].stop):
+                        return stopped[first]
+            return None
+        finally:
+            pending = [task for task in tasks.values() if not task.done()]
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
@@ -0,0 +1,94 @@
+import asyncio
+from typing import Awaitable, Callable, Dict, List
+
+
+class MicroBatcher:
+    """Coalesces concurrent single calls into one batched call
+
+    Items submitted within `window` seconds of the first pending one (or
+    until `max_items` are pending) go to send_batch together. send_batch
+    returns one result per item, in order; an Exception in that list
+    fails only its own caller. Added latency is bounded by the window.
+    """
+
+    def __init__(self, send_batch: Callable[[List], Awaitable[List]], window: float = 0.002, max_items: int = 64):
+        self.send_batch = send_batch
+        self.window = window
+        self.max_items = max_items
+        self.pending = []
+        self.timer = None
+        self.tasks = set()
+        self.batches = 0
+        self.items = 0
+
+    async def submit(self, item):
+        future = asyncio.get_running_loop().create_future()
+        self.pending.append((item, future))
+        if len(self.pending) >= self.max_items:
+            self.flush()
+        elif self.timer is None:
+            self.timer = asyncio.get_running_loop().call_later(self.window, self.flush)
+        return await future
+
+    def flush(self):
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+        batch, self.pending = self.pending, []
+        if batch:
+            task = asyncio.ensure_future(self._send(batch))
+            self.tasks.add(task)
+            task.add_done_callback(self.tasks.discard)
+
+    async def _send(self, batch):
+        self.batches += 1
+        self.items += len(batch)
+        try:
+            results = await self.send_batch([item for item, _ in batch])
+        except Exception as e:
+            results = [e] * len(batch)
+        if len(results) != len(batch):
+            # Fail the unmatched callers now rather than at their timeout
+            error = RuntimeError(f"send_batch returned {len(results)} results for {len(batch)} items")
+            results = list(results[:len(batch)]) + [error] * (len(batch) - len(results))
+        for (_, future), result in zip(batch, results):
+            # Callers that gave up (fan-out timeout) have cancelled futures
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    def metrics(self):
+        return {
+            "window_ms": 1000 * self.window,
+            "max_items": self.max_items,
+            "batches": self.batches,
+            "items": self.items,
+            "avg_batch_size": self.items / self.batches if self.batches else 0.0
+        }
+
+
+class SingleFlight:
+    """Shares one in-flight call among concurrent callers with the same key"""
+
+    def __init__(self):
+        self.inflight: Dict[str, asyncio.Future] = {}
+        self.calls = 0
+        self.shared = 0
+
+    async def do(self, key, factory: Callable[[], Awaitable]):
+        task = self.inflight.get(key)
+        if task is None:
+            self.calls += 1
+            task = asyncio.ensure_future(factory())
+            self.inflight[key] = task
+            task.add_done_callback(lambda _: self.inflight.pop(key, None))
+        else:
+            self.shared += 1
+        # One caller timing out must not cancel the call for the others
+        return await asyncio.shield(task)
+
+    def metrics(self):
+        return {"calls": self.calls, "shared": self.shared, "in_flight": len(self.inflight)}
@@ -0,0 +1,112 @@
+import importlib.util
+import inspect
+import os
+import sys
+from pathlib import Path
+import httpx
+from fastapi import HTTPException
+from fastapi.encoders import jsonable_encoder
+from fastapi.routing import APIRoute
+from pydantic import BaseModel, ValidationError
+from starlette.concurrency import run_in_threadpool
+
+DEFAULT_SERVICES_DIR = Path(__file__).resolve().parents[3]
+SERVICES_DIR = Path(os.getenv("ACLSA_SERVICES_DIR", str(DEFAULT_SERVICES_DIR)))
+
+
+def load_service(name: str, services_dir=None):
+    """Import <services_dir>/<name>_service/app.py as a library module
+
+    The module gets a unique name so the services' app.py files do not
+    shadow each other, and the service directory is put on sys.path for
+    its own sibling imports (features, graph, ...).
+    """
+    module_name = f"aclsa_{name}_service"
+    if module_name in sys.modules:
+        return sys.modules[module_name]
+    service_dir = Path(services_dir or SERVICES_DIR) / f"{name}_service"
+    if str(service_dir) not in sys.path:
+        sys.path.append(str(service_dir))
+    spec = importlib.util.spec_from_file_location(module_name, service_dir / "app.py")
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    try:
+        spec.loader.exec_module(module)
+    except Exception:
+        del sys.modules[module_name]
+        raise
+    return module
+
+
+class InProcessService:
+    """Calls a service's POST endpoints directly instead of over HTTP
+
+    Request bodies are handed to the endpoint as the pydantic model (or
+    dict) it declares, and the endpoint's return value comes back as is,
+    with no JSON encoding or socket in between. Sync endpoints run in the
+    threadpool as they would under FastAPI, so fan-out deadlines still
+    apply. Errors surface as httpx.HTTPStatusError so callers see the
+    same failures in both topologies.
+    """
+
+    def __init__(self, name: str, app):
+        self.name = name
+        self.app = app
+        self.routes = [
+            route for route in app.routes
+            if isinstance(route, APIRoute) and "POST" in route.methods
+        ]
+        self.started = False
+
+    @classmethod
+    def load(cls, name: str, services_dir=None):
+        return cls(name, load_service(name, services_dir).app)
+
+    async def start(self):
+        if not self.started:
+            await self._run_handlers(self.app.router.on_startup)
+            self.started = True
+
+    async def close(self):
+        if self.started:
+            self.started = False
+            await self._run_handlers(self.app.router.on_shutdown)
+
+    @staticmethod
+    async def _run_handlers(handlers):
+        for handler in handlers:
+            result = handler()
+            if inspect.isawaitable(result):
+                await result
+
+    async def post(self, path: str, json=None, params=None):
+        for route in self.routes:
+            match = route.path_regex.match(path)
+            if match:
+                break
+        else:
+            raise self._error(path, 404, "Not Found")
+
+        kwargs = dict(match.groupdict())
+        kwargs.update(params or {})
+        try:
+            for param in inspect.signature(route.endpoint).parameters.values():
+                if param.name in kwargs:
+                    continue
+                annotation = param.annotation
+                if inspect.isclass(annotation) and issubclass(annotation, BaseModel):
+                    kwargs[param.name] = annotation(**(json or {}))
+                else:
+                    kwargs[param.name] = json if json is not None else {}
+            if inspect.iscoroutinefunction(route.endpoint):
+                return await route.endpoint(**kwargs)
+            return await run_in_threadpool(route.endpoint, **kwargs)
+        except ValidationError as e:
+            raise self._error(path, 422, jsonable_encoder(e.errors()))
+        except HTTPException as e:
+            raise self._error(path, e.status_code, e.detail)
+
+    def _error(self, path, status_code, detail):
+        request = httpx.Request("POST", f"inprocess://{self.name}{path}")
+        response = httpx.Response(status_code, json={"detail": detail}, request=request)
+        return httpx.HTTPStatusError(f"{status_code} from {self.name}{path}", request=request, response=response)
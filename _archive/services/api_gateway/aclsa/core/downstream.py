@@ -0,0 +1,219 @@
+import asyncio
+import importlib.util
+import json as jsonlib
+import os
+import time
+import httpx
+from aclsa.core.bindings import InProcessService
+from aclsa.core.telemetry import inject, span
+from aclsa.core.resilience import CircuitBreaker, CircuitOpenError, FallbackCache, LatencyTracker
+
+SERVICE_URLS = {
+    "memory": os.getenv("MEMORY_SERVICE_URL", "http://memory:8002"),
+    "planning": os.getenv("PLANNING_SERVICE_URL", "http://planning:8003"),
+    "rl": os.getenv("RL_SERVICE_URL", "http://rl:8004"),
+}
+
+# "http" talks to each service over the network, "inprocess" imports the
+# services into the gateway process and calls their endpoints directly
+TOPOLOGY = os.getenv("ACLSA_TOPOLOGY", "http")
+
+
+class ServiceStats:
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.total_latency = 0.0
+
+    def as_dict(self):
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "in_flight": self.in_flight,
+            "max_in_flight": self.max_in_flight,
+            "avg_latency_ms": 1000 * self.total_latency / self.requests if self.requests else 0.0
+        }
+
+
+class DownstreamClients:
+    """One pooled keep-alive httpx.AsyncClient per downstream service
+
+    Created at gateway startup and closed at shutdown, so requests reuse
+    warm connections instead of opening a client per message. Every call
+    goes through a per-service circuit breaker; idempotent calls can be
+    hedged after the service's recent p95 latency, and while a circuit
+    is open the last good response for the same request is served.
+
+    With topology "inprocess" the same calls go to InProcessService
+    bindings instead, so a single-box deployment has no HTTP hops.
+    """
+
+    def __init__(self, urls=None, topology=None):
+        self.urls = dict(urls or SERVICE_URLS)
+        self.topology = topology or TOPOLOGY
+        if self.topology not in ("http", "inprocess"):
+            raise ValueError(f"Unknown topology {self.topology!r}")
+        self.limits = httpx.Limits(
+            max_connections=int(os.getenv("DOWNSTREAM_MAX_CONNECTIONS", "100")),
+            max_keepalive_connections=int(os.getenv("DOWNSTREAM_MAX_KEEPALIVE", "20")),
+            keepalive_expiry=float(os.getenv("DOWNSTREAM_KEEPALIVE_EXPIRY", "30"))
+        )
+        self.timeout = httpx.Timeout(
+            float(os.getenv("DOWNSTREAM_TIMEOUT", "10")),
+            connect=float(os.getenv("DOWNSTREAM_CONNECT_TIMEOUT", "2"))
+        )
+        # HTTP/2 needs the optional h2 package
+        self.http2 = os.getenv("DOWNSTREAM_HTTP2", "0") == "1" and importlib.util.find_spec("h2") is not None
+        self.clients = {}
+        self.stats = {name: ServiceStats() for name in self.urls}
+        self.breakers = {name: CircuitBreaker() for name in self.urls}
+        self.latency = {name: LatencyTracker() for name in self.urls}
+        self.fallbacks = FallbackCache(int(os.getenv("DOWNSTREAM_FALLBACK_ENTRIES", "1024")))
+        self.hedge_min_samples = int(os.getenv("HEDGE_MIN_SAMPLES", "20"))
+        self.hedges = 0
+
+    async def start(self):
+        for name, url in self.urls.items():
+            if name in self.clients:
+                continue
+            if self.topology == "inprocess":
+                binding = InProcessService.load(name)
+                await binding.start()
+                self.clients[name] = binding
+            else:
+                self.clients[name] = httpx.AsyncClient(
+                    base_url=url, limits=self.limits, timeout=self.timeout, http2=self.http2
+                )
+
+    async def close(self):
+        clients, self.clients = self.clients, {}
+        for client in clients.values():
+            if isinstance(client, InProcessService):
+                await client.close()
+            else:
+                await client.aclose()
+
+    async def client(self, service: str):
+        if service not in self.clients:
+            await self.start()
+        return self.clients[service]
+
+    async def post(self, service: str, path: str, json=None, hedge: bool = False, cache: bool = False, **kwargs):
+        """POST to a service and return the decoded JSON body
+
+        hedge=True is only for idempotent calls: a second attempt is sent
+        if the first has not answered within the recent p95 latency.
+        cache=True is only for idempotent reads: successful responses are
+        kept as fallbacks and served, marked "stale": True, while the
+        circuit is open. Otherwise, and when nothing is cached, an open
+        circuit raises CircuitOpenError, so a write is never reported as
+        done when it was not sent.
+        """
+        key = self.request_key(service, path, json) if cache else None
+        breaker = self.breakers[service]
+        if not breaker.allow():
+            cached = self.fallbacks.get(key) if cache else None
+            if cached is None:
+                raise CircuitOpenError(service)
+            return {**cached, "stale": True}
+
+        start = time.perf_counter()
+        try:
+            if hedge:
+                result = await self._hedged(service, path, json, **kwargs)
+            else:
+                result = await self._send(service, path, json, **kwargs)
+        except httpx.HTTPStatusError as e:
+            # Client errors say nothing about service health
+            breaker.record(e.response.status_code < 500, time.perf_counter() - start)
+            raise
+        except (Exception, asyncio.CancelledError):
+            # Cancellation here means a fan-out timeout cut the call short
+            breaker.record(False, time.perf_counter() - start)
+            raise
+        latency = time.perf_counter() - start
+        breaker.record(True, latency)
+        self.latency[service].add(latency)
+        if cache:
+            self.fallbacks.put(key, result)
+        return result
+
+    @staticmethod
+    def request_key(service: str, path: str, json=None):
+        return (service, path, jsonlib.dumps(json, sort_keys=True, default=str))
+
+    async def _hedged(self, service: str, path: str, json, **kwargs):
+        tracker = self.latency[service]
+        delay = tracker.percentile(0.95) if len(tracker.samples) >= self.hedge_min_samples else None
+        if delay is None:
+            return await self._send(service, path, json, **kwargs)
+        attempts = {asyncio.ensure_future(self._send(service, path, json, **kwargs))}
+        try:
+            done, _ = await asyncio.wait(attempts, timeout=delay)
+            if not done:
+                self.hedges += 1
+                attempts.add(asyncio.ensure_future(self._send(service, path, json, **kwargs)))
+            error = None
+            while attempts:
+                done, attempts = await asyncio.wait(attempts, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in attempts:
+                task.cancel()
+
+    async def _send(self, service: str, path: str, json=None, **kwargs):
+        client = await self.client(service)
+        stats = self.stats[service]
+        stats.requests += 1
+        stats.in_flight += 1
+        stats.max_in_flight = max(stats.max_in_flight, stats.in_flight)
+        start = time.perf_counter()
+        try:
+            with span(f"{service} POST {path}", kind="client", topology=self.topology) as attributes:
+                if isinstance(client, InProcessService):
+                    return await client.post(path, json=json, **kwargs)
+                headers = inject(dict(kwargs.pop("headers", None) or {}))
+                response = await client.post(path, json=json, headers=headers, **kwargs)
+                attributes["status"] = response.status_code
+                response.raise_for_status()
+                with span("decode", bytes=len(response.content)):
+                    return response.json()
+        except Exception:
+            stats.errors += 1
+            raise
+        finally:
+            stats.in_flight -= 1
+            stats.total_latency += time.perf_counter() - start
+
+    def metrics(self):
+        services = {}
+        for name, stats in self.stats.items():
+            entry = stats.as_dict()
+            entry["utilization"] = stats.in_flight / self.limits.max_connections
+            # httpcore pool internals; best effort, absent on other transports
+            pool = getattr(getattr(self.clients.get(name), "_transport", None), "_pool", None)
+            connections = getattr(pool, "connections", None)
+            if connections is not None:
+                entry["pool_connections"] = len(connections)
+                entry["pool_idle"] = sum(1 for c in connections if c.is_idle())
+            entry["circuit"] = self.breakers[name].as_dict()
+            entry["p95_latency_ms"] = 1000 * (self.latency[name].percentile(0.95) or 0.0)
+            services[name] = entry
+        return {
+            "topology": self.topology,
+            "http2": self.http2,
+            "max_connections": self.limits.max_connections,
+            "max_keepalive_connections": self.limits.max_keepalive_connections,
+            "hedged_requests": self.hedges,
+            "fallback_hits": self.fallbacks.hits,
+            "services": services
+        }
+
+
+clients = DownstreamClients()
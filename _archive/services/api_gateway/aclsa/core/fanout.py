@@ -0,0 +1,39 @@
+import asyncio
+from typing import Awaitable, Callable, Dict, Optional
+
+
+async def fan_out(calls: Dict[str, Callable[[], Awaitable]], deadline: float,
+                  timeouts: Optional[Dict[str, float]] = None):
+    """Run independent downstream calls concurrently under one overall deadline
+
+    Each call also gets its own timeout. Returns (results, degraded):
+    results holds every call that finished in time, degraded maps the
+    rest to "timeout", "deadline" or the error that ended them.
+    """
+    timeouts = timeouts or {}
+    tasks = {
+        name: asyncio.ensure_future(asyncio.wait_for(factory(), timeouts.get(name, deadline)))
+        for name, factory in calls.items()
+    }
+    if not tasks:
+        return {}, {}
+    _, pending = await asyncio.wait(tasks.values(), timeout=deadline)
+    for task in pending:
+        task.cancel()
+    if pending:
+        await asyncio.gather(*pending, return_exceptions=True)
+
+    results = {}
+    degraded = {}
+    for name, task in tasks.items():
+        if task in pending:
+            degraded[name] = "deadline"
+        elif task.exception() is not None:
+            error = task.exception()
+            if isinstance(error, asyncio.TimeoutError):
+                degraded[name] = "timeout"
+            else:
+                degraded[name] = getattr(error, "reason", None) or f"error: {type(error).__name__}"
+        else:
+            results[name] = task.result()
+    return results, degraded
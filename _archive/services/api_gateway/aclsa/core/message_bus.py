@@ -1,11 +1,184 @@
+import asyncio
+import itertools
+import time
+from collections import deque
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any, Dict, List, Optional
+
+OVERFLOW_POLICIES = ("block", "drop_oldest", "drop_newest")
+
+
+@dataclass(frozen=True)
+class Event:
+    """Immutable event; the same instance is shared by every subscriber queue"""
+    topic: str
+    sender: str
+    message: Any
+    seq: int
+    ts: float
+
+    def as_dict(self):
+        return {"from": self.sender, "message": self.message}
+
+
+class Subscription:
+    """Bounded queue for one subscriber group on one topic
+
+    Consumers in the same group compete for events; each group sees every
+    event published to the topic. When the queue is full, "block" makes
+    publishers wait, "drop_oldest" evicts the head and "drop_newest"
+    discards the incoming event.
+    """
+
+    def __init__(self, topic: str, group: str, maxsize: int = 1000, overflow: str = "block"):
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy {overflow!r}")
+        self.topic = topic
+        self.group = group
+        self.maxsize = maxsize
+        self.overflow = overflow
+        self.queue = deque()
+        self._not_empty = asyncio.Event()
+        self._not_full = asyncio.Event()
+        self.received = 0
+        self.delivered = 0
+        self.dropped = 0
+
+    def put_nowait(self, event: Event) -> bool:
+        """Enqueue without waiting; False if the event was dropped
+
+        Raises asyncio.QueueFull for the "block" policy when full.
+        """
+        if self.full():
+            if self.overflow == "drop_newest":
+                self.dropped += 1
+                return False
+            if self.overflow == "drop_oldest":
+                self.queue.popleft()
+                self.dropped += 1
+            else:
+                raise asyncio.QueueFull
+        self.queue.append(event)
+        self.received += 1
+        self._not_empty.set()
+        return True
+
+    async def put(self, event: Event) -> bool:
+        while self.overflow == "block" and self.full():
+            self._not_full.clear()
+            await self._not_full.wait()
+        return self.put_nowait(event)
+
+    def full(self) -> bool:
+        return len(self.queue) >= self.maxsize
+
+    async def fetch(self, max_items: Optional[int] = 100, timeout: Optional[float] = None) -> List[Event]:
+        """Wait up to timeout for at least one event, then return up to max_items (None: all)"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not self.queue:
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                return []
+            self._not_empty.clear()
+            try:
+                await asyncio.wait_for(self._not_empty.wait(), remaining)
+            except asyncio.TimeoutError:
+                return []
+
+        count = len(self.queue) if max_items is None else min(max_items, len(self.queue))
+        batch = [self.queue.popleft() for _ in range(count)]
+        self.delivered += len(batch)
+        self._not_full.set()
+        return batch
+
+    def metrics(self):
+        return {
+            "depth": len(self.queue),
+            "maxsize": self.maxsize,
+            "overflow": self.overflow,
+            "received": self.received,
+            "delivered": self.delivered,
+            "dropped": self.dropped,
+            # Age of the oldest event still waiting
+            "lag_seconds": time.time() - self.queue[0].ts if self.queue else 0.0
+        }
+
+
 class MessageBus:
-    def __init__(self):
-        self.events = []
+    """asyncio pub/sub bus with named topics and bounded subscriber groups
+
+    The "default" group of the "default" topic always exists, so the old
+    `bus.emit(sender, msg); await bus.fetch()` usage keeps every event. It
+    drops its oldest events rather than blocking emitters when nobody
+    drains it.
+    """
+
+    def __init__(self, maxsize: int = 1000, overflow: str = "block"):
+        self.maxsize = maxsize
+        self.overflow = overflow
+        self.topics: Dict[str, Dict[str, Subscription]] = {}
+        self.published: Dict[str, int] = {}
+        self._seq = itertools.count(1)
+        self._anonymous = itertools.count(1)
+        self.subscribe("default", "default", overflow="drop_oldest")
+
+    def subscribe(self, topic: str, group: Optional[str] = None,
+                  maxsize: Optional[int] = None, overflow: Optional[str] = None) -> Subscription:
+        """Join (or create) a subscriber group; group=None makes a private one"""
+        groups = self.topics.setdefault(topic, {})
+        group = group or f"_sub{next(self._anonymous)}"
+        if group not in groups:
+            groups[group] = Subscription(topic, group, maxsize or self.maxsize, overflow or self.overflow)
+        return groups[group]
+
+    def unsubscribe(self, subscription: Subscription):
+        self.topics.get(subscription.topic, {}).pop(subscription.group, None)
+
+    def _event(self, topic, sender, message):
+        if isinstance(message, dict):
+            message = MappingProxyType(dict(message))
+        self.published[topic] = self.published.get(topic, 0) + 1
+        return Event(topic, sender, message, next(self._seq), time.time())
+
+    async def publish(self, topic: str, sender: str, message) -> Event:
+        event = self._event(topic, sender, message)
+        for subscription in list(self.topics.get(topic, {}).values()):
+            await subscription.put(event)
+        return event
+
+    def emit(self, sender, message, topic: str = "default") -> Event:
+        """Publish without waiting
+
+        Raises asyncio.QueueFull, before delivering to any group, when a
+        "block" group of the topic is full.
+        """
+        subscriptions = list(self.topics.get(topic, {}).values())
+        if any(sub.overflow == "block" and sub.full() for sub in subscriptions):
+            raise asyncio.QueueFull
+        event = self._event(topic, sender, message)
+        for subscription in subscriptions:
+            subscription.put_nowait(event)
+        return event
+
+    async def fetch(self, topic: str = "default", group: str = "default",
+                    max_items: Optional[int] = None, timeout: Optional[float] = 0) -> List[Event]:
+        """Drain a group's queued events; by default returns at once, like the old bus
 
-    def emit(self, sender, message):
-        self.events.append({"from": sender, "message": message})
+        Only reads existing groups (raises KeyError otherwise); creating
+        one here would start buffering, and with "block" eventually
+        stalling, every publish to the topic.
+        """
+        subscription = self.topics.get(topic, {}).get(group)
+        if subscription is None:
+            raise KeyError(f"No subscriber group {group!r} on topic {topic!r}")
+        return await subscription.fetch(max_items, timeout)
 
-    def fetch(self):
-        events = self.events[:]
-        self.events.clear()
-        return events
+    def metrics(self):
+        return {
+            topic: {
+                "published": self.published.get(topic, 0),
+                "groups": {name: sub.metrics() for name, sub in groups.items()}
+            }
+            for topic, groups in self.topics.items()
+        }
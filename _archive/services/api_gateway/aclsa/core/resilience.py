@@ -0,0 +1,115 @@
+import os
+import time
+from collections import OrderedDict, deque
+
+
+class CircuitOpenError(Exception):
+    reason = "circuit_open"
+
+    def __init__(self, service: str):
+        super().__init__(f"Circuit open for {service}")
+        self.service = service
+
+
+class CircuitBreaker:
+    """Rolling-window circuit breaker with half-open probing
+
+    Opens when, over the last `window` calls (and `window_seconds`), the
+    error rate or the share of calls slower than `slow_call_seconds`
+    crosses its threshold. After `open_seconds` it lets `probes` calls
+    through; one success closes it, one failure re-opens it.
+    """
+
+    def __init__(self, window=None, window_seconds=None, min_calls=None, error_rate=None,
+                 slow_call_seconds=None, slow_call_rate=None, open_seconds=None, probes=1):
+        self.window_seconds = window_seconds or float(os.getenv("BREAKER_WINDOW_SECONDS", "30"))
+        self.min_calls = min_calls or int(os.getenv("BREAKER_MIN_CALLS", "10"))
+        self.error_rate = error_rate or float(os.getenv("BREAKER_ERROR_RATE", "0.5"))
+        self.slow_call_seconds = slow_call_seconds or float(os.getenv("BREAKER_SLOW_CALL_SECONDS", "2.0"))
+        self.slow_call_rate = slow_call_rate or float(os.getenv("BREAKER_SLOW_CALL_RATE", "0.8"))
+        self.open_seconds = open_seconds or float(os.getenv("BREAKER_OPEN_SECONDS", "10"))
+        self.probes = probes
+        self.calls = deque(maxlen=window or int(os.getenv("BREAKER_WINDOW", "50")))
+        self.state = "closed"
+        self.opened_at = 0.0
+        self.times_opened = 0
+        self._probes_in_flight = 0
+
+    def allow(self) -> bool:
+        if self.state == "open":
+            if time.monotonic() - self.opened_at < self.open_seconds:
+                return False
+            self.state = "half_open"
+            self._probes_in_flight = 0
+        if self.state == "half_open":
+            if self._probes_in_flight >= self.probes:
+                return False
+            self._probes_in_flight += 1
+        return True
+
+    def record(self, ok: bool, latency: float):
+        now = time.monotonic()
+        if self.state == "half_open":
+            self._probes_in_flight = max(self._probes_in_flight - 1, 0)
+            if ok and latency < self.slow_call_seconds:
+                self.state = "closed"
+                self.calls.clear()
+            else:
+                self._open(now)
+            return
+        self.calls.append((now, ok, latency))
+        while self.calls and now - self.calls[0][0] > self.window_seconds:
+            self.calls.popleft()
+        if self.state == "closed" and len(self.calls) >= self.min_calls:
+            n = len(self.calls)
+            errors = sum(1 for _, ok_, _ in self.calls if not ok_)
+            slow = sum(1 for _, _, lat in self.calls if lat >= self.slow_call_seconds)
+            if errors / n >= self.error_rate or slow / n >= self.slow_call_rate:
+                self._open(now)
+
+    def _open(self, now):
+        self.state = "open"
+        self.opened_at = now
+        self.times_opened += 1
+        self.calls.clear()
+
+    def as_dict(self):
+        return {"state": self.state, "window_calls": len(self.calls), "times_opened": self.times_opened}
+
+
+class LatencyTracker:
+    """Recent successful-call latencies, for the hedging delay"""
+
+    def __init__(self, size: int = 200):
+        self.samples = deque(maxlen=size)
+
+    def add(self, latency: float):
+        self.samples.append(latency)
+
+    def percentile(self, q: float):
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+
+class FallbackCache:
+    """Bounded LRU of the last good response per request, served while a circuit is open"""
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.hits = 0
+
+    def get(self, key):
+        value = self.entries.get(key)
+        if value is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+        return value
+
+    def put(self, key, value):
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
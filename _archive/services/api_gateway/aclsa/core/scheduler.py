@@ -0,0 +1,117 @@
+import asyncio
+import heapq
+import itertools
+import math
+import os
+import time
+from contextlib import asynccontextmanager
+from aclsa.core.resilience import LatencyTracker
+
+
+class Overloaded(Exception):
+    def __init__(self, tier: str, retry_after: int):
+        super().__init__(f"Tier {tier} is overloaded")
+        self.tier = tier
+        self.retry_after = retry_after
+
+
+class Tier:
+    """Concurrency slots plus a priority wait queue for one class of request
+
+    Lower priority values are served first, FIFO within a priority. With
+    max_queue set, arrivals beyond it are shed with Overloaded instead of
+    queueing.
+    """
+
+    def __init__(self, name: str, concurrency: int, max_queue=None):
+        self.name = name
+        self.concurrency = concurrency
+        self.max_queue = max_queue
+        self.in_flight = 0
+        self.waiters = []
+        self._seq = itertools.count()
+        self.queue_time = LatencyTracker()
+        self.service_time = LatencyTracker()
+        self.completed = 0
+        self.rejected = 0
+
+    @property
+    def queued(self):
+        return sum(1 for _, _, future in self.waiters if not future.done())
+
+    def retry_after(self) -> int:
+        service = self.service_time.percentile(0.5) or 1.0
+        return max(1, math.ceil(service * (self.queued + 1) / self.concurrency))
+
+    async def acquire(self, priority: int = 0):
+        start = time.perf_counter()
+        if self.in_flight < self.concurrency and not self.queued:
+            self.in_flight += 1
+        else:
+            if self.max_queue is not None and self.queued >= self.max_queue:
+                self.rejected += 1
+                raise Overloaded(self.name, self.retry_after())
+            future = asyncio.get_running_loop().create_future()
+            heapq.heappush(self.waiters, (priority, next(self._seq), future))
+            try:
+                await future
+            except asyncio.CancelledError:
+                # The slot may have been handed over just before cancellation
+                if future.done() and not future.cancelled():
+                    self.release()
+                raise
+        self.queue_time.add(time.perf_counter() - start)
+
+    def release(self):
+        while self.waiters:
+            _, _, future = heapq.heappop(self.waiters)
+            if not future.done():
+                # Hand the slot straight to the next waiter
+                future.set_result(None)
+                return
+        self.in_flight -= 1
+
+    def metrics(self):
+        return {
+            "concurrency": self.concurrency,
+            "max_queue": self.max_queue,
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "queue_ms_p50": 1000 * (self.queue_time.percentile(0.5) or 0.0),
+            "queue_ms_p95": 1000 * (self.queue_time.percentile(0.95) or 0.0),
+            "service_ms_p50": 1000 * (self.service_time.percentile(0.5) or 0.0)
+        }
+
+
+class TierScheduler:
+    """Separate slots and queues per tier so cheap replies never wait behind heavy work
+
+    fast: small talk and short-input replies, no downstream calls
+    light: single downstream call (email capture)
+    heavy: full-agent fan-out; the only tier that sheds load
+    """
+
+    def __init__(self):
+        self.tiers = {
+            "fast": Tier("fast", int(os.getenv("SCHED_FAST_CONCURRENCY", "256"))),
+            "light": Tier("light", int(os.getenv("SCHED_LIGHT_CONCURRENCY", "64"))),
+            "heavy": Tier("heavy", int(os.getenv("SCHED_HEAVY_CONCURRENCY", "16")),
+                          max_queue=int(os.getenv("SCHED_HEAVY_MAX_QUEUE", "64"))),
+        }
+
+    @asynccontextmanager
+    async def slot(self, tier: str, priority: int = 0):
+        tier = self.tiers[tier]
+        await tier.acquire(priority)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            tier.service_time.add(time.perf_counter() - start)
+            tier.completed += 1
+            tier.release()
+
+    def metrics(self):
+        return {name: tier.metrics() for name, tier in self.tiers.items()}
@@ -0,0 +1,27 @@
+import logging
+import os
+import sys
+from contextlib import contextmanager
+from aclsa.core.bindings import SERVICES_DIR
+
+# tracing.py is shared by all services and lives next to them
+if str(SERVICES_DIR) not in sys.path:
+    sys.path.append(str(SERVICES_DIR))
+
+try:
+    from tracing import inject, instrument, span
+except ImportError:  # deployed without the shared services directory
+    if os.getenv("TRACE_EXPORT"):
+        logging.getLogger("aclsa").warning(
+            "TRACE_EXPORT is set but tracing.py was not found in %s; tracing is disabled", SERVICES_DIR
+        )
+
+    def inject(headers):
+        return headers
+
+    def instrument(app, service):
+        return app
+
+    @contextmanager
+    def span(name, **attributes):
+        yield attributes
@@ -6,7 +6,7 @@ app = FastAPI()
 brain = SupervisorAgent()
 
 @app.post("/message")
-def message(user_id: str, text: str):
+async def message(user_id: str, text: str):
     context = Context(user_id, text)
-    reply = brain.run(context)
+    reply = await brain.arun(context)
     return {"response": reply}
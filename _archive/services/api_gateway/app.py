@@ -1,8 +1,14 @@
+from typing import Optional
 from fastapi import FastAPI
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
-from aclsa.brain.supervisor import handle_message
+from aclsa.brain.supervisor import batching_metrics, handle_message, scheduler
+from aclsa.core.scheduler import Overloaded
+from aclsa.core.downstream import clients
+from aclsa.core.telemetry import instrument
 
 app = FastAPI(title="ACLSA AGENT API")
+instrument(app, "gateway")
 
 app.add_middleware(
     CORSMiddleware,
@@ -11,10 +17,33 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.on_event("startup")
+async def startup():
+    await clients.start()
+
+@app.on_event("shutdown")
+async def shutdown():
+    await clients.close()
+
 @app.post("/message")
-def message(user_id: str, text: str):
-    return {"response": handle_message(user_id, text)}
+async def message(user_id: str, text: str, fields: Optional[str] = None):
+    try:
+        return {"response": await handle_message(user_id, text, fields)}
+    except Overloaded as e:
+        return JSONResponse(
+            status_code=503,
+            content={"detail": str(e)},
+            headers={"Retry-After": str(e.retry_after)}
+        )
 
 @app.get("/health")
 def health():
     return {"status": "agent_running"}
+
+@app.get("/metrics/downstream")
+def downstream_metrics():
+    return {**clients.metrics(), "batching": batching_metrics()}
+
+@app.get("/metrics/scheduler")
+def scheduler_metrics():
+    return scheduler.metrics()
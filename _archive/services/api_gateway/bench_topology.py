@@ -0,0 +1,138 @@
+"""Compare gateway downstream latency in the http and inprocess topologies
+
+Starts the memory, planning and RL services with uvicorn on loopback
+ports, then drives the full-agent fan-out (planning simulation + RL
+decision) through DownstreamClients in each topology.
+
+    python bench_topology.py --requests 500 --concurrency 16
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import httpx
+from aclsa.brain.supervisor import PLANNING_PATH, RL_PATH
+from aclsa.core.bindings import SERVICES_DIR
+from aclsa.core.downstream import DownstreamClients
+from aclsa.core.fanout import fan_out
+
+SERVICES = ("memory", "planning", "rl")
+
+
+def start_services(base_port: int, env):
+    processes, urls = [], {}
+    for offset, name in enumerate(SERVICES):
+        port = base_port + offset
+        processes.append(subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "app:app", "--host", "127.0.0.1", "--port", str(port),
+             "--log-level", "warning"],
+            cwd=SERVICES_DIR / f"{name}_service", env=env
+        ))
+        urls[name] = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 30
+    for url in urls.values():
+        while True:
+            try:
+                httpx.get(f"{url}/health").raise_for_status()
+                break
+            except httpx.HTTPError:
+                if time.monotonic() > deadline:
+                    raise RuntimeError(f"{url} did not come up")
+                time.sleep(0.2)
+    return processes, urls
+
+
+async def one_message(clients, user_id):
+    return await fan_out(
+        {
+            "plan": lambda: clients.post("planning", PLANNING_PATH, json={"user_id": user_id, "horizon_days": 90}),
+            "decision": lambda: clients.post(
+                "rl", RL_PATH, json={"user_id": user_id, "current_state": {"energy": 0.7, "skills_ready": True}}
+            ),
+        },
+        deadline=30.0
+    )
+
+
+async def run(topology, urls, requests, concurrency, warmup):
+    clients = DownstreamClients(urls=urls, topology=topology)
+    await clients.start()
+    try:
+        for i in range(warmup):
+            await one_message(clients, f"warmup-{i}")
+
+        latencies = []
+        failures = 0
+        queue = iter(range(requests))
+
+        async def worker():
+            nonlocal failures
+            for i in queue:
+                start = time.perf_counter()
+                _, degraded = await one_message(clients, f"user-{i % 100}")
+                latencies.append(time.perf_counter() - start)
+                failures += bool(degraded)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+    finally:
+        await clients.close()
+
+    latencies.sort()
+    return {
+        "topology": topology,
+        "requests": requests,
+        "concurrency": concurrency,
+        "failures": failures,
+        "throughput_rps": requests / elapsed,
+        "mean_ms": 1000 * statistics.fmean(latencies),
+        "p50_ms": 1000 * latencies[len(latencies) // 2],
+        "p95_ms": 1000 * latencies[min(int(0.95 * len(latencies)), len(latencies) - 1)],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--base-port", type=int, default=18102)
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args()
+
+    # Keep the services' on-disk state out of the working tree
+    scratch = tempfile.mkdtemp(prefix="aclsa-bench-")
+    env = dict(os.environ,
+               RL_POLICY_DIR=os.path.join(scratch, "policies"),
+               RL_DECISION_LOG_DIR=os.path.join(scratch, "decisions"))
+    os.environ.update(RL_POLICY_DIR=env["RL_POLICY_DIR"], RL_DECISION_LOG_DIR=env["RL_DECISION_LOG_DIR"])
+
+    processes, urls = start_services(args.base_port, env)
+    try:
+        results = [
+            asyncio.run(run(topology, urls, args.requests, args.concurrency, args.warmup))
+            for topology in ("http", "inprocess")
+        ]
+    finally:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.wait()
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{'topology':<10} {'rps':>9} {'mean ms':>9} {'p50 ms':>9} {'p95 ms':>9} {'failed':>7}")
+    for r in results:
+        print(f"{r['topology']:<10} {r['throughput_rps']:>9.1f} {r['mean_ms']:>9.2f} "
+              f"{r['p50_ms']:>9.2f} {r['p95_ms']:>9.2f} {r['failures']:>7}")
+
+
+if __name__ == "__main__":
+    main()
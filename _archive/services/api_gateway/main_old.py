@@ -1,8 +1,11 @@
+from typing import Optional
 from fastapi import FastAPI
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 
 # import agent brain
 from aclsa.brain.supervisor import handle_message
+from aclsa.core.scheduler import Overloaded
 
 app = FastAPI(title="ACLSA Agent (Single Service)")
 
@@ -14,8 +17,15 @@ app.add_middleware(
 )
 
 @app.post("/message")
-def message(user_id: str, text: str):
-    return {"response": handle_message(user_id, text)}
+async def message(user_id: str, text: str, fields: Optional[str] = None):
+    try:
+        return {"response": await handle_message(user_id, text, fields)}
+    except Overloaded as e:
+        return JSONResponse(
+            status_code=503,
+            content={"detail": str(e)},
+            headers={"Retry-After": str(e.retry_after)}
+        )
 @app.get("/")
 def root():
     return {
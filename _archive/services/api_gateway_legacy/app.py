@@ -1,10 +1,10 @@
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, EmailStr
-from datetime import datetime, timedelta
-import secrets
+from datetime import datetime
 from typing import Dict, List
 import random
+from session_tokens import from_env
 
 app = FastAPI(title="ACLSA API")
 
@@ -18,9 +18,19 @@ app.add_middleware(
 
 # Database
 users_db = {}
-sessions = {}
 user_data = {}
 
+# Signed, self-contained session tokens; no per-worker session table
+sessions = from_env()
+
+def session_email(token: str) -> str:
+    claims = sessions.verify(token)
+    # Users live in this process's memory: a valid token may name a user
+    # registered before a restart or on another worker
+    if claims is None or claims["sub"] not in user_data:
+        raise HTTPException(status_code=401, detail="Unauthorized")
+    return claims["sub"]
+
 class UserRegister(BaseModel):
     email: EmailStr
     password: str
@@ -64,11 +74,7 @@ def login(user: UserLogin):
     if users_db[user.email]["password"] != user.password:
         raise HTTPException(status_code=401, detail="Invalid credentials")
     
-    token = secrets.token_urlsafe(32)
-    sessions[token] = {
-        "email": user.email,
-        "expires": (datetime.now() + timedelta(days=7)).isoformat()
-    }
+    token = sessions.issue(user.email)
     
     return {
         "token": token,
@@ -78,12 +84,16 @@ def login(user: UserLogin):
         }
     }
 
-@app.post("/skills/add")
-def add_skill(skill: SkillAdd, token: str):
-    if token not in sessions:
+@app.post("/auth/logout")
+def logout(token: str):
+    if not sessions.revoke(token):
         raise HTTPException(status_code=401, detail="Unauthorized")
     
-    email = sessions[token]["email"]
+    return {"message": "Logged out"}
+
+@app.post("/skills/add")
+def add_skill(skill: SkillAdd, token: str):
+    email = session_email(token)
     
     skill_obj = {
         "id": len(user_data[email]["skills"]) + 1,
@@ -99,18 +109,12 @@ def add_skill(skill: SkillAdd, token: str):
 
 @app.get("/skills/list")
 def list_skills(token: str):
-    if token not in sessions:
-        raise HTTPException(status_code=401, detail="Unauthorized")
-    
-    email = sessions[token]["email"]
+    email = session_email(token)
     return {"skills": user_data[email]["skills"]}
 
 @app.delete("/skills/{skill_id}")
 def delete_skill(skill_id: int, token: str):
-    if token not in sessions:
-        raise HTTPException(status_code=401, detail="Unauthorized")
-    
-    email = sessions[token]["email"]
+    email = session_email(token)
     user_data[email]["skills"] = [s for s in user_data[email]["skills"] if s["id"] != skill_id]
     
     return {"message": "Skill deleted"}
@@ -435,10 +439,7 @@ What specific help do you need?"""
 
 @app.post("/ai/chat")
 def ai_chat(data: Dict, token: str):
-    if token not in sessions:
-        raise HTTPException(status_code=401, detail="Unauthorized")
-    
-    email = sessions[token]["email"]
+    email = session_email(token)
     message = data.get("message", "")
     
     skills = user_data[email]["skills"]
@@ -468,10 +469,7 @@ def ai_chat(data: Dict, token: str):
 
 @app.post("/ai/analyze")
 def analyze_profile(token: str):
-    if token not in sessions:
-        raise HTTPException(status_code=401, detail="Unauthorized")
-    
-    email = sessions[token]["email"]
+    email = session_email(token)
     skills = user_data[email]["skills"]
     
     if not skills:
@@ -510,10 +508,7 @@ def analyze_profile(token: str):
 
 @app.get("/dashboard/stats")
 def get_stats(token: str):
-    if token not in sessions:
-        raise HTTPException(status_code=401, detail="Unauthorized")
-    
-    email = sessions[token]["email"]
+    email = session_email(token)
     data = user_data[email]
     
     return {
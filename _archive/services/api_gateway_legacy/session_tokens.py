@@ -0,0 +1,83 @@
+import base64
+import hashlib
+import hmac
+import json
+import logging
+import os
+import secrets
+import time
+from typing import Dict, Optional
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+class SessionTokens:
+    """Self-contained HMAC-SHA256 signed session tokens
+
+    A token is base64url(payload).base64url(signature) with the email,
+    expiry and a random id in the payload, so any worker sharing the key
+    verifies it without a lookup. Logged-out ids go into a revocation set
+    that forgets each id once its token would have expired anyway.
+
+    The revocation set is per process: a token revoked on one worker
+    stays valid on the others until it expires.
+    """
+
+    def __init__(self, secret: bytes, ttl: float = 7 * 24 * 3600):
+        self.secret = secret
+        self.ttl = ttl
+        self.revoked: Dict[str, float] = {}
+        self._next_sweep = 0.0
+
+    def _sign(self, payload: str) -> str:
+        return _b64encode(hmac.new(self.secret, payload.encode(), hashlib.sha256).digest())
+
+    def issue(self, email: str) -> str:
+        claims = {"sub": email, "exp": int(time.time() + self.ttl), "jti": secrets.token_urlsafe(12)}
+        payload = _b64encode(json.dumps(claims, separators=(",", ":")).encode())
+        return f"{payload}.{self._sign(payload)}"
+
+    def verify(self, token: str) -> Optional[Dict]:
+        """Claims of a valid, unexpired, unrevoked token; otherwise None"""
+        payload, _, signature = token.partition(".")
+        if not signature or not hmac.compare_digest(signature.encode(), self._sign(payload).encode()):
+            return None
+        try:
+            claims = json.loads(_b64decode(payload))
+        except ValueError:
+            return None
+        if claims.get("exp", 0) <= time.time() or claims.get("jti") in self.revoked:
+            return None
+        return claims
+
+    def revoke(self, token: str) -> bool:
+        claims = self.verify(token)
+        if claims is None:
+            return False
+        now = time.time()
+        self.revoked[claims["jti"]] = claims["exp"]
+        if now >= self._next_sweep:
+            self.revoked = {jti: exp for jti, exp in self.revoked.items() if exp > now}
+            self._next_sweep = now + 60
+        return True
+
+
+def from_env() -> SessionTokens:
+    secret = os.getenv("SECRET_KEY")
+    if not secret:
+        # A random key only verifies tokens issued by this process
+        if int(os.getenv("WEB_CONCURRENCY", "1")) > 1:
+            raise RuntimeError("SECRET_KEY must be set when running several workers")
+        logging.getLogger("api_gateway_legacy").warning(
+            "SECRET_KEY is not set; using a random key, so sessions end on restart "
+            "and tokens do not verify on other workers"
+        )
+        secret = secrets.token_urlsafe(32)
+    ttl = float(os.getenv("SESSION_TTL_DAYS", "7")) * 24 * 3600
+    return SessionTokens(secret.encode(), ttl)
@@ -2,15 +2,32 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 from typing import Dict, List
+import os
+from constraints import ConstraintEngine, load_constraints
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from tracing import instrument
 
 app = FastAPI(title="ACLSA Ethics Service")
+instrument(app, "ethics")
 app.add_middleware(CORSMiddleware, allow_origins=["*"], allow_methods=["*"], allow_headers=["*"])
 
+# Compiled once at startup
+engine = ConstraintEngine(load_constraints(os.getenv("ETHICS_CONSTRAINTS_FILE")))
+
 class ValidationRequest(BaseModel):
     user_id: str
     proposed_action: str
     current_state: Dict
 
+class UserState(BaseModel):
+    user_id: str
+    current_state: Dict
+
+class BatchValidationRequest(BaseModel):
+    users: List[UserState]
+    actions: List[str]
+
 @app.get("/health")
 def health():
     return {"status": "healthy", "service": "ethics"}
@@ -19,31 +36,7 @@ def health():
 def validate_action(request: ValidationRequest):
     """Validate action against ethical constraints"""
     
-    violations = []
-    warnings = []
-    
-    state = request.current_state
-    action = request.proposed_action
-    
-    # Check health constraints
-    if state.get("health", 0.8) < 0.3:
-        if "study" in action or "work" in action:
-            violations.append("Health too low for intensive activity")
-    
-    # Check burnout risk
-    work_hours = state.get("weekly_hours", 40)
-    if work_hours > 60:
-        if "work" in action or "study" in action:
-            warnings.append("Risk of burnout - consider rest")
-    
-    # Check financial constraints
-    if state.get("financial_buffer", 1000) < 500:
-        if "explore" in action:
-            warnings.append("Low financial buffer - risky to explore new domains")
-    
-    # Check time constraints
-    if state.get("available_hours", 8) < 2:
-        violations.append("Insufficient time available")
+    violations, warnings = engine.reasons(request.current_state, request.proposed_action)
     
     approved = len(violations) == 0
     
@@ -58,6 +51,24 @@ def validate_action(request: ValidationRequest):
         "alternative_suggestion": "rest_and_recover" if not approved else None
     }
 
+@app.post("/ethics/validate_batch")
+def validate_batch(request: BatchValidationRequest):
+    """Validate M candidate actions x N users in one call"""
+    
+    violations, warnings, safety = engine.evaluate(
+        [u.current_state for u in request.users],
+        request.actions
+    )
+    
+    return {
+        "user_ids": [u.user_id for u in request.users],
+        "actions": request.actions,
+        "approved": (violations == 0).tolist(),
+        "violations": violations.tolist(),
+        "warnings": warnings.tolist(),
+        "safety_scores": safety.tolist()
+    }
+
 @app.post("/ethics/explain")
 def explain_decision(data: dict):
     """Explain why a decision was made"""
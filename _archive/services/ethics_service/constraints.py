@@ -0,0 +1,143 @@
+import json
+import numpy as np
+from typing import Dict, List
+
+# Constraints as data. applies_to lists action keywords ("*" = every action);
+# a constraint fires when `state[field] <op> threshold`.
+DEFAULT_CONSTRAINTS = [
+    {
+        "name": "health",
+        "field": "health", "default": 0.8, "op": "<", "threshold": 0.3,
+        "applies_to": ["study", "work"], "severity": "violation",
+        "message": "Health too low for intensive activity"
+    },
+    {
+        "name": "burnout",
+        "field": "weekly_hours", "default": 40, "op": ">", "threshold": 60,
+        "applies_to": ["work", "study"], "severity": "warning",
+        "message": "Risk of burnout - consider rest"
+    },
+    {
+        "name": "financial",
+        "field": "financial_buffer", "default": 1000, "op": "<", "threshold": 500,
+        "applies_to": ["explore"], "severity": "warning",
+        "message": "Low financial buffer - risky to explore new domains"
+    },
+    {
+        "name": "time",
+        "field": "available_hours", "default": 8, "op": "<", "threshold": 2,
+        "applies_to": "*", "severity": "violation",
+        "message": "Insufficient time available"
+    }
+]
+
+OPS = {
+    "<": np.less,
+    "<=": np.less_equal,
+    ">": np.greater,
+    ">=": np.greater_equal,
+    "==": np.equal,
+    "!=": np.not_equal
+}
+
+SEVERITIES = ("violation", "warning")
+
+
+def _value(state: Dict, field: str, default: float) -> float:
+    """state[field] as a float; the default when missing, non-numeric or not finite"""
+    try:
+        value = float(state.get(field, default))
+    except (TypeError, ValueError):
+        return default
+    return value if np.isfinite(value) else default
+
+
+def load_constraints(path: str = None) -> List[Dict]:
+    if not path:
+        return DEFAULT_CONSTRAINTS
+    with open(path) as f:
+        return json.load(f)
+
+
+class ConstraintEngine:
+    """Constraints compiled into column-wise NumPy predicates
+
+    Evaluating N states x M actions is one comparison per operator over an
+    (N, fields) matrix plus two small matrix products against the (M, C)
+    applicability mask.
+    """
+
+    def __init__(self, constraints: List[Dict]):
+        for c in constraints:
+            if c["op"] not in OPS:
+                raise ValueError(f"Unknown operator {c['op']!r} in constraint {c.get('name')}")
+            if c["severity"] not in SEVERITIES:
+                raise ValueError(f"Unknown severity {c['severity']!r} in constraint {c.get('name')}")
+        self.constraints = constraints
+        self.fields = list(dict.fromkeys(c["field"] for c in constraints))
+        defaults = {}
+        for c in constraints:
+            defaults.setdefault(c["field"], c.get("default", 0.0))
+        self.defaults = [float(defaults[f]) for f in self.fields]
+        self.field_index = np.array([self.fields.index(c["field"]) for c in constraints], dtype=np.int64)
+        self.thresholds = np.array([float(c["threshold"]) for c in constraints])
+        self.op_groups = []
+        for op, fn in OPS.items():
+            cols = np.array([i for i, c in enumerate(constraints) if c["op"] == op], dtype=np.int64)
+            if len(cols):
+                self.op_groups.append((fn, cols))
+        self.is_violation = np.array([c["severity"] == "violation" for c in constraints])
+        self.messages = [c["message"] for c in constraints]
+        self.applies_to = [
+            c["applies_to"] if c["applies_to"] == "*" or not isinstance(c["applies_to"], str) else [c["applies_to"]]
+            for c in constraints
+        ]
+        self._applicability_cache = {}
+
+    def state_matrix(self, states: List[Dict]) -> np.ndarray:
+        S = np.empty((len(states), len(self.fields)))
+        for j, (field, default) in enumerate(zip(self.fields, self.defaults)):
+            S[:, j] = [_value(s, field, default) for s in states]
+        return S
+
+    def triggered(self, states: List[Dict]) -> np.ndarray:
+        """(N, C) bool: which constraints fire for each state"""
+        S = self.state_matrix(states)
+        T = np.zeros((len(states), len(self.constraints)), dtype=np.bool_)
+        for fn, cols in self.op_groups:
+            T[:, cols] = fn(S[:, self.field_index[cols]], self.thresholds[cols])
+        return T
+
+    def _action_row(self, action: str) -> np.ndarray:
+        row = self._applicability_cache.get(action)
+        if row is None:
+            row = np.array([
+                keywords == "*" or any(k in action for k in keywords)
+                for keywords in self.applies_to
+            ], dtype=np.bool_)
+            if len(self._applicability_cache) >= 4096:
+                self._applicability_cache.clear()
+            self._applicability_cache[action] = row
+        return row
+
+    def applicability(self, actions: List[str]) -> np.ndarray:
+        """(M, C) bool: which constraints apply to each action (cached per action name)"""
+        if not actions:
+            return np.zeros((0, len(self.constraints)), dtype=np.bool_)
+        return np.stack([self._action_row(a) for a in actions])
+
+    def evaluate(self, states: List[Dict], actions: List[str]):
+        """Returns (N, M) violation counts, warning counts and safety scores"""
+        T = self.triggered(states).astype(np.int32)
+        A = self.applicability(actions).astype(np.int32)
+        violations = T[:, self.is_violation] @ A[:, self.is_violation].T
+        warnings = T[:, ~self.is_violation] @ A[:, ~self.is_violation].T
+        safety = 1.0 - (violations * 0.3 + warnings * 0.1)
+        return violations, warnings, safety
+
+    def reasons(self, state: Dict, action: str):
+        """Violation and warning messages for one state/action pair"""
+        hits = self.triggered([state])[0] & self._action_row(action)
+        violations = [m for m, h, v in zip(self.messages, hits, self.is_violation) if h and v]
+        warnings = [m for m, h, v in zip(self.messages, hits, self.is_violation) if h and not v]
+        return violations, warnings
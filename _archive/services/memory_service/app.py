@@ -4,8 +4,13 @@ from pydantic import BaseModel
 from typing import List, Optional
 from datetime import datetime
 import uuid
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from tracing import instrument
 
 app = FastAPI(title="ACLSA Memory Service")
+instrument(app, "memory")
 app.add_middleware(CORSMiddleware, allow_origins=["*"], allow_methods=["*"], allow_headers=["*"])
 
 # In-memory storage (replace with Qdrant in production)
@@ -2,16 +2,23 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 import numpy as np
-from typing import List, Dict
+from typing import List, Dict, Optional
 import random
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from tracing import instrument
 
 app = FastAPI(title="ACLSA Planning Service")
+instrument(app, "planning")
 app.add_middleware(CORSMiddleware, allow_origins=["*"], allow_methods=["*"], allow_headers=["*"])
 
 class PlanRequest(BaseModel):
     user_id: str
     horizon_days: int = 90
     num_simulations: int = 100
+    # Response keys to build; None returns everything
+    fields: Optional[List[str]] = None
 
 @app.get("/health")
 def health():
@@ -19,9 +26,17 @@ def health():
 
 @app.post("/planning/simulate")
 def simulate_trajectories(request: PlanRequest):
-    """Run Monte Carlo simulations for future trajectories"""
+    """Run Monte Carlo simulations for future trajectories
+    
+    request.fields limits the response keys; per-week events are only
+    recorded when trajectories are requested.
+    """
+    
+    def wants(key):
+        return request.fields is None or key in request.fields
     
     trajectories = []
+    keep_events = wants("trajectories")
     
     for sim in range(min(request.num_simulations, 10)):  # Limit for demo
         trajectory = {
@@ -29,6 +44,8 @@ def simulate_trajectories(request: PlanRequest):
             "days": request.horizon_days,
             "events": []
         }
+        # Only the top 3 are returned
+        record = keep_events and sim < 3
         
         # Simulate random events
         current_skill = 0.5
@@ -42,11 +59,12 @@ def simulate_trajectories(request: PlanRequest):
             else:
                 current_skill += random.uniform(0, 0.01)
             
-            trajectory["events"].append({
-                "day": day,
-                "action": action,
-                "skill_level": min(current_skill, 1.0)
-            })
+            if record:
+                trajectory["events"].append({
+                    "day": day,
+                    "action": action,
+                    "skill_level": min(current_skill, 1.0)
+                })
         
         trajectory["final_skill"] = min(current_skill, 1.0)
         trajectory["success_probability"] = min(current_skill, 1.0)
@@ -55,19 +73,24 @@ def simulate_trajectories(request: PlanRequest):
     # Calculate statistics
     final_skills = [t["final_skill"] for t in trajectories]
     
-    return {
-        "user_id": request.user_id,
-        "num_simulations": len(trajectories),
-        "trajectories": trajectories[:3],  # Return top 3
-        "statistics": {
+    response = {}
+    if wants("user_id"):
+        response["user_id"] = request.user_id
+    if wants("num_simulations"):
+        response["num_simulations"] = len(trajectories)
+    if keep_events:
+        response["trajectories"] = trajectories[:3]  # Return top 3
+    if wants("statistics"):
+        response["statistics"] = {
             "mean_outcome": np.mean(final_skills),
             "std_outcome": np.std(final_skills),
             "best_case": max(final_skills),
             "worst_case": min(final_skills),
             "median": np.median(final_skills)
-        },
-        "recommendation": "Focus on consistent study for best outcomes"
-    }
+        }
+    if wants("recommendation"):
+        response["recommendation"] = "Focus on consistent study for best outcomes"
+    return response
 
 @app.post("/planning/counterfactual")
 def counterfactual_analysis(data: dict):
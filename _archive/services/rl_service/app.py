@@ -1,90 +1,282 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from pydantic import BaseModel, StrictInt
 import numpy as np
-from typing import List, Dict
-import random
+from typing import List, Dict, Optional, Union
+import os
+from features import ACTIONS, NUM_FEATURES, state_matrix, heuristic_scores, heuristic_probabilities, top_k, explore
+from replay import ReplayBuffer
+from trainer import Trainer
+from artifacts import PolicyStore
+from bandit import LinearBandit
+from decision_log import DecisionLogger
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from tracing import instrument
 
 app = FastAPI(title="ACLSA RL Service")
+instrument(app, "rl")
 app.add_middleware(CORSMiddleware, allow_origins=["*"], allow_methods=["*"], allow_headers=["*"])
 
-# Action space
-ACTIONS = [
-    "study_high_priority_skill",
-    "work_on_project", 
-    "apply_to_jobs",
-    "rest_and_recover",
-    "network_socialize",
-    "explore_new_domain"
-]
+rng = np.random.default_rng()
+buffer = ReplayBuffer(int(os.getenv("RL_REPLAY_CAPACITY", "100000")), NUM_FEATURES)
+store = PolicyStore(os.getenv("RL_POLICY_DIR", "policies"), float(os.getenv("RL_POLICY_POLL_SECONDS", "1.0")))
+trainer = Trainer(buffer, len(ACTIONS), store)
+
+# "q": learned Q policy (heuristic until trained), "linucb" / "thompson": online bandit
+POLICY_MODE = os.getenv("RL_POLICY_MODE", "q")
+bandit = LinearBandit(
+    len(ACTIONS), NUM_FEATURES,
+    alpha=float(os.getenv("RL_BANDIT_ALPHA", "1.0")),
+    mode=POLICY_MODE if POLICY_MODE in ("linucb", "thompson") else "linucb"
+)
+
+def score_states(X):
+    """Score (N, d) states with the active policy"""
+    if POLICY_MODE in ("linucb", "thompson"):
+        return bandit.scores(X, rng), POLICY_MODE
+    policy = store.current()
+    if policy is not None:
+        return policy.scores(X), policy.version
+    return heuristic_scores(X, rng), "heuristic"
+
+# Exploration rate; also what makes logged decisions usable for off-policy evaluation
+EXPLORATION = float(os.getenv("RL_EXPLORATION", "0.1"))
+decision_log = DecisionLogger(
+    os.getenv("RL_DECISION_LOG_DIR", "decision_logs"),
+    max_bytes=int(float(os.getenv("RL_DECISION_LOG_MAX_MB", "64")) * 1024 * 1024),
+    keep=int(os.getenv("RL_DECISION_LOG_KEEP", "8"))
+) if os.getenv("RL_LOG_DECISIONS", "1") == "1" else None
+
+def choose_actions(X):
+    """Score, pick (epsilon-greedy) and log; returns scores, actions, propensities, ids, version"""
+    scores, policy_version = score_states(X)
+    # Propensities must account for randomness in the greedy choice itself
+    if policy_version == "heuristic":
+        base_probs = heuristic_probabilities(X)
+    elif policy_version == "thompson":
+        base_probs = bandit.probabilities(X, rng)
+    else:
+        base_probs = None
+    actions, propensities = explore(scores, EXPLORATION, rng, base_probs)
+    if decision_log is not None:
+        decision_ids = decision_log.log(X, actions, propensities)
+    else:
+        decision_ids = [None] * len(actions)
+    return scores, actions, propensities, decision_ids, policy_version
+
+def action_index(action):
+    # bool is an int subclass; True must not mean action 1
+    if isinstance(action, int) and not isinstance(action, bool) and 0 <= action < len(ACTIONS):
+        return action
+    if action in ACTIONS:
+        return ACTIONS.index(action)
+    raise HTTPException(status_code=400, detail=f"Unknown action: {action}")
 
 class DecisionRequest(BaseModel):
     user_id: str
     current_state: Dict
     context: str = "career_planning"
+    # Response keys to build; None returns everything
+    fields: Optional[List[str]] = None
+
+class FeedbackRequest(BaseModel):
+    user_id: str
+    state: Dict
+    # StrictInt keeps true/false from being read as actions 1/0
+    action: Union[StrictInt, str]
+    reward: float
+    next_state: Optional[Dict] = None
+    decision_id: Optional[str] = None
+
+class BatchDecisionItem(BaseModel):
+    user_id: str
+    current_state: Dict
+    fields: Optional[List[str]] = None
+
+class BatchDecisionRequest(BaseModel):
+    requests: List[BatchDecisionItem]
+    top_k: int = 3
+    context: str = "career_planning"
+    detail: bool = False
+
+@app.on_event("shutdown")
+def shutdown():
+    trainer.shutdown()
+    if decision_log is not None:
+        decision_log.close()
 
 @app.get("/health")
 def health():
     return {"status": "healthy", "service": "rl"}
 
-@app.post("/rl/decide")
-def make_decision(request: DecisionRequest):
-    """RL agent recommends optimal action"""
+def decision_payload(user_id, row, action, propensity, decision_id, policy_version, fields=None):
+    """/rl/decide response for one user; fields limits which keys are built"""
+    chosen = ACTIONS[action]
     
-    # Simple heuristic (replace with trained PPO model)
-    state = request.current_state
-    
-    # Calculate scores for each action
-    action_scores = {}
-    for action in ACTIONS:
-        score = random.uniform(0.5, 1.0)  # Placeholder
-        
-        # Add heuristics
-        if "study" in action and state.get("energy", 0.5) > 0.6:
-            score += 0.2
-        if "rest" in action and state.get("energy", 0.5) < 0.4:
-            score += 0.3
-        if "project" in action and state.get("skills_ready", False):
-            score += 0.25
-            
-        action_scores[action] = score
-    
-    # Select best action
-    best_action = max(action_scores.items(), key=lambda x: x[1])
+    def action_scores():
+        return {name: float(score) for name, score in zip(ACTIONS, row)}
     
-    return {
-        "user_id": request.user_id,
-        "recommended_action": best_action[0],
-        "confidence": best_action[1],
+    def alternatives():
+        ranked = sorted(action_scores().items(), key=lambda x: x[1], reverse=True)
+        return [item for item in ranked if item[0] != chosen][:2]
+    
+    builders = {
+        "user_id": lambda: user_id,
+        "recommended_action": lambda: chosen,
+        "confidence": lambda: float(row[action]),
         "action_scores": action_scores,
-        "rationale": f"Based on current state analysis, {best_action[0]} offers the best long-term outcome",
-        "expected_reward": {
+        "rationale": lambda: f"Based on current state analysis, {chosen} offers the best long-term outcome",
+        "expected_reward": lambda: {
             "career_progress": 0.15,
             "well_being": 0.10,
             "stability": 0.05
         },
-        "alternative_actions": sorted(action_scores.items(), key=lambda x: x[1], reverse=True)[1:3]
+        "alternative_actions": alternatives,
+        "policy_version": lambda: policy_version,
+        "decision_id": lambda: decision_id,
+        "propensity": lambda: propensity
+    }
+    return {key: build() for key, build in builders.items() if fields is None or key in fields}
+
+@app.post("/rl/decide")
+def make_decision(request: DecisionRequest):
+    """RL agent recommends optimal action"""
+    
+    X = state_matrix([request.current_state])
+    scores, actions, propensities, decision_ids, policy_version = choose_actions(X)
+    
+    # Selected (mostly best) action
+    return decision_payload(request.user_id, scores[0], int(actions[0]), float(propensities[0]),
+                            decision_ids[0], policy_version, request.fields)
+
+@app.post("/rl/decide_batch")
+def make_batch_decision(request: BatchDecisionRequest):
+    """Score many users x all actions in one matrix operation
+    
+    With detail=true each item carries the full /rl/decide response, so
+    callers can batch single decisions transparently.
+    """
+    
+    if not request.requests:
+        return {"decisions": [], "count": 0}
+    
+    X = state_matrix([item.current_state for item in request.requests])
+    scores, actions, propensities, decision_ids, policy_version = choose_actions(X)
+    
+    decisions = []
+    if request.detail:
+        for item, row, action, propensity, decision_id in zip(request.requests, scores.tolist(), actions.tolist(),
+                                                             propensities.tolist(), decision_ids):
+            decisions.append(decision_payload(item.user_id, row, action, propensity,
+                                              decision_id, policy_version, item.fields))
+        return {"decisions": decisions, "count": len(decisions), "policy_version": policy_version}
+    
+    best = top_k(scores, request.top_k)
+    best_scores = np.take_along_axis(scores, best, axis=1)
+    chosen_scores = scores[np.arange(len(actions)), actions]
+    
+    rows = zip(request.requests, actions.tolist(), chosen_scores.tolist(), propensities.tolist(),
+               decision_ids, best.tolist(), best_scores.tolist())
+    for item, action, score, propensity, decision_id, idx, vals in rows:
+        decisions.append({
+            "user_id": item.user_id,
+            "recommended_action": ACTIONS[action],
+            "confidence": score,
+            "top_actions": [[ACTIONS[i], v] for i, v in zip(idx, vals)],
+            "decision_id": decision_id,
+            "propensity": propensity
+        })
+    
+    return {"decisions": decisions, "count": len(decisions), "policy_version": policy_version}
+
+@app.post("/rl/feedback")
+def feedback(request: FeedbackRequest):
+    """Online reward signal: O(d^2) bandit update plus replay buffer append"""
+    
+    # A NaN or infinite reward would poison the bandit and replay buffer for good
+    if not np.isfinite(request.reward):
+        raise HTTPException(status_code=400, detail="Reward must be finite")
+    action = action_index(request.action)
+    x = state_matrix([request.state])[0]
+    bandit.update(x, action, request.reward)
+    
+    next_x = state_matrix([request.next_state])[0] if request.next_state is not None else x
+    buffer.add(x, action, request.reward, next_x, done=request.next_state is None)
+    
+    logged = False
+    if request.decision_id and decision_log is not None:
+        logged = decision_log.set_reward(request.decision_id, request.reward)
+    
+    return {
+        "status": "success",
+        "user_id": request.user_id,
+        "action": ACTIONS[action],
+        "feedback_events": int(bandit.counts.sum()),
+        "decision_logged": logged
     }
 
 @app.post("/rl/train")
 def train_agent(data: dict):
-    """Train RL agent on experience"""
+    """Ingest experience into the replay buffer and train in a background process"""
+    
+    experiences = data.get("experiences", [])
+    if experiences:
+        states = state_matrix([e.get("state", {}) for e in experiences])
+        next_states = state_matrix([e.get("next_state", e.get("state", {})) for e in experiences])
+        actions = np.array([action_index(e["action"]) for e in experiences])
+        try:
+            rewards = np.array([float(e.get("reward", 0.0)) for e in experiences])
+        except (TypeError, ValueError):
+            raise HTTPException(status_code=400, detail="Rewards must be numbers")
+        if not np.isfinite(rewards).all():
+            raise HTTPException(status_code=400, detail="Rewards must be finite")
+        dones = np.array([bool(e.get("done", "next_state" not in e)) for e in experiences])
+        buffer.add_batch(states, actions, rewards, next_states, dones)
+    
+    episodes = int(data.get("episodes", 100))
+    started = trainer.start(episodes, float(data.get("gamma", 0.9)))
+    
+    if started:
+        status = "training_started"
+    elif trainer.running:
+        status = "training_in_progress"
+    else:
+        status = "no_experience"
+    
     return {
-        "status": "training_started",
-        "episodes": data.get("episodes", 100),
-        "message": "Agent training in progress (simulated)"
+        "status": status,
+        "episodes": episodes,
+        "experiences_added": len(experiences),
+        "buffer_size": len(buffer)
     }
 
 @app.get("/rl/policy/{user_id}")
 def get_policy(user_id: str):
     """Get current policy for user"""
+    policy = store.current()
+    manifest = store.manifest
+    curve = manifest.get("value_curve", [])
+    if POLICY_MODE != "q":
+        policy_version = POLICY_MODE
+    else:
+        policy_version = policy.version if policy else "heuristic"
     return {
         "user_id": user_id,
-        "policy_version": "v1.0",
-        "training_episodes": 1000,
+        "policy_version": policy_version,
+        "artifact_version": policy.version if policy else None,
+        "training_episodes": manifest.get("training_episodes", 0),
+        "training_runs": manifest.get("training_runs", 0),
+        "training": trainer.running,
+        "buffer_size": len(buffer),
+        "policy_mode": POLICY_MODE,
+        "bandit": bandit.stats(),
         "performance_metrics": {
-            "avg_reward": 0.75,
-            "success_rate": 0.82,
-            "convergence": True
+            "avg_reward": manifest["reward_curve"][-1]["avg_reward"] if manifest.get("reward_curve") else None,
+            "reward_curve": manifest.get("reward_curve", []),
+            "value_curve": curve,
+            "bellman_error": manifest.get("bellman_error"),
+            "convergence": len(curve) > 1 and abs(curve[-1] - curve[-2]) < 1e-3,
+            "last_error": trainer.last_error or store.last_error
         }
     }
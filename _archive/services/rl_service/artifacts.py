@@ -0,0 +1,124 @@
+import hashlib
+import json
+import os
+import time
+import numpy as np
+from threading import Lock
+from typing import Optional
+from trainer import LinearQPolicy
+
+POINTER = "CURRENT"
+
+
+def _atomic_write(path: str, write):
+    tmp = f"{path}.tmp.{os.getpid()}"
+    with open(tmp, "wb") as f:
+        write(f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def _sha256(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class PolicyStore:
+    """Versioned, checksummed policy weights shared by all workers on a box
+
+    Each version is a .npy file plus a JSON manifest; the CURRENT pointer
+    file names the active version and is replaced atomically. Workers map
+    the weights read-only (mmap_mode="r"), so N workers share one
+    page-cache copy, and poll the pointer to switch without a restart.
+    """
+
+    def __init__(self, directory: str, poll_interval: float = 1.0, keep: int = 5):
+        self.directory = directory
+        self.poll_interval = poll_interval
+        self.keep = keep
+        self.policy: Optional[LinearQPolicy] = None
+        self.manifest: dict = {}
+        self.last_error = None
+        self._pointer_stamp = None
+        self._next_poll = 0.0
+        self._lock = Lock()
+        os.makedirs(directory, exist_ok=True)
+        self.refresh()
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def publish(self, weights: np.ndarray, meta: dict) -> str:
+        """Write a new version and point CURRENT at it"""
+        weights = np.ascontiguousarray(weights, dtype=np.float64)
+        digest = hashlib.sha256(weights.tobytes()).hexdigest()
+        version = f"v{int(time.time() * 1000)}-{digest[:8]}"
+        _atomic_write(self._path(f"{version}.npy"), lambda f: np.save(f, weights))
+        manifest = {
+            "version": version,
+            "sha256": _sha256(self._path(f"{version}.npy")),
+            "shape": list(weights.shape),
+            "created_at": time.time(),
+            **meta
+        }
+        _atomic_write(self._path(f"{version}.json"), lambda f: f.write(json.dumps(manifest).encode()))
+        _atomic_write(self._path(POINTER), lambda f: f.write(version.encode()))
+        self.refresh()
+        self._prune(version)
+        return version
+
+    def _prune(self, current: str):
+        """Drop old versions; workers still mapping them keep their pages until they switch"""
+        versions = sorted(n[:-5] for n in os.listdir(self.directory) if n.endswith(".json"))
+        for version in versions[:-self.keep]:
+            if version == current:
+                continue
+            for ext in (".npy", ".json"):
+                try:
+                    os.remove(self._path(version + ext))
+                except FileNotFoundError:
+                    pass
+
+    def current(self) -> Optional[LinearQPolicy]:
+        """Active policy; checks the pointer at most once per poll_interval"""
+        if time.monotonic() >= self._next_poll:
+            self.refresh()
+        return self.policy
+
+    def refresh(self):
+        self._next_poll = time.monotonic() + self.poll_interval
+        try:
+            st = os.stat(self._path(POINTER))
+        except FileNotFoundError:
+            return
+        stamp = (st.st_mtime_ns, st.st_size, st.st_ino)
+        if stamp == self._pointer_stamp:
+            return
+        with self._lock:
+            if stamp == self._pointer_stamp:
+                return
+            try:
+                self._load(stamp)
+            except (OSError, ValueError) as e:
+                self.last_error = str(e)
+
+    def _load(self, stamp):
+        with open(self._path(POINTER)) as f:
+            version = f.read().strip()
+        if self.policy is not None and version == self.policy.version:
+            self._pointer_stamp = stamp
+            return
+        with open(self._path(f"{version}.json")) as f:
+            manifest = json.load(f)
+        weights_path = self._path(f"{version}.npy")
+        if _sha256(weights_path) != manifest["sha256"]:
+            raise ValueError(f"Checksum mismatch for policy {version}")
+        weights = np.load(weights_path, mmap_mode="r")
+        self.policy = LinearQPolicy(weights, version)
+        self.manifest = manifest
+        self._pointer_stamp = stamp
+        self.last_error = None
@@ -0,0 +1,107 @@
+import glob
+import os
+import time
+import numpy as np
+from threading import Lock
+from features import NUM_FEATURES
+
+# Fixed-size binary records so logs can be memory-mapped and scanned in chunks.
+# reward stays NaN until feedback arrives for the decision.
+RECORD = np.dtype([
+    ("ts", "<f8"),
+    ("features", "<f4", (NUM_FEATURES,)),
+    ("action", "<i2"),
+    ("propensity", "<f4"),
+    ("reward", "<f4")
+])
+REWARD_OFFSET = RECORD.fields["reward"][1]
+
+
+class DecisionLogger:
+    """Append-only decision log, rotated files per worker process
+
+    Each worker writes decisions-<pid>-<seq>.bin and starts the next file
+    once the current one reaches max_bytes; only the newest `keep` files
+    of the worker are kept. Decision ids are "<pid>-<seq>-<row>", so
+    feedback handled by any worker can write the reward in place with a
+    single pwrite (or is dropped once its file was rotated away).
+    """
+
+    def __init__(self, directory: str, max_bytes: int = 64 * 1024 * 1024, keep: int = 8):
+        self.directory = directory
+        self.max_rows = max(1, max_bytes // RECORD.itemsize)
+        self.keep = max(1, keep)
+        os.makedirs(directory, exist_ok=True)
+        self.pid = os.getpid()
+        # A restarted worker may reuse a pid; carry on after its newest file
+        self.seqs = sorted(int(path.rsplit("-", 1)[1][:-4]) for path in glob.glob(self._path(self.pid, "*")))
+        self._fd = None
+        self._lock = Lock()
+        self._open(self.seqs[-1] if self.seqs else 0)
+
+    def _path(self, pid, seq):
+        return os.path.join(self.directory, f"decisions-{pid}-{seq}.bin")
+
+    def _open(self, seq):
+        if self._fd is not None:
+            os.close(self._fd)
+        self.seq = seq
+        self.path = self._path(self.pid, seq)
+        self._fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        self._rows = os.fstat(self._fd).st_size // RECORD.itemsize
+        if not self.seqs or self.seqs[-1] != seq:
+            self.seqs.append(seq)
+        while len(self.seqs) > self.keep:
+            try:
+                os.remove(self._path(self.pid, self.seqs.pop(0)))
+            except FileNotFoundError:
+                pass
+
+    def log(self, X: np.ndarray, actions: np.ndarray, propensities: np.ndarray):
+        """Append one record per row; returns the decision ids"""
+        records = np.empty(len(actions), dtype=RECORD)
+        records["ts"] = time.time()
+        records["features"] = X
+        records["action"] = actions
+        records["propensity"] = propensities
+        records["reward"] = np.nan
+        with self._lock:
+            if self._rows and self._rows + len(actions) > self.max_rows:
+                self._open(self.seq + 1)
+            start, seq = self._rows, self.seq
+            os.write(self._fd, records.tobytes())
+            self._rows += len(actions)
+        return [f"{self.pid}-{seq}-{row}" for row in range(start, start + len(actions))]
+
+    def set_reward(self, decision_id: str, reward: float) -> bool:
+        try:
+            pid, seq, row = (int(part) for part in decision_id.split("-"))
+        except ValueError:
+            return False
+        try:
+            fd = os.open(self._path(pid, seq), os.O_WRONLY)
+        except FileNotFoundError:
+            return False
+        try:
+            offset = row * RECORD.itemsize
+            if offset + RECORD.itemsize > os.fstat(fd).st_size:
+                return False
+            os.pwrite(fd, np.float32(reward).tobytes(), offset + REWARD_OFFSET)
+        finally:
+            os.close(fd)
+        return True
+
+    def close(self):
+        with self._lock:
+            os.close(self._fd)
+
+
+def iter_chunks(directory: str, chunk_rows: int = 1_000_000):
+    """Yield record arrays from every log file without loading them fully"""
+    for path in sorted(glob.glob(os.path.join(directory, "decisions-*.bin"))):
+        rows = os.path.getsize(path) // RECORD.itemsize
+        if rows == 0:
+            continue
+        log = np.memmap(path, dtype=RECORD, mode="r", shape=(rows,))
+        for start in range(0, rows, chunk_rows):
+            yield log[start:start + chunk_rows]
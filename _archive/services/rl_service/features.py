@@ -0,0 +1,133 @@
+import numpy as np
+from typing import Dict, List
+
+# Action space
+ACTIONS = [
+    "study_high_priority_skill",
+    "work_on_project",
+    "apply_to_jobs",
+    "rest_and_recover",
+    "network_socialize",
+    "explore_new_domain"
+]
+
+# Action metadata as bitmasks (replaces substring checks on action names)
+STUDY = 1 << 0
+PROJECT = 1 << 1
+REST = 1 << 2
+
+ACTION_FLAGS = np.array([
+    STUDY,
+    PROJECT,
+    0,
+    REST,
+    0,
+    0
+], dtype=np.uint8)
+
+# State features: (key, default, scale). Column 0 of the feature matrix is a bias term.
+STATE_FEATURES = [
+    ("energy", 0.5, 1.0),
+    ("skills_ready", False, 1.0),
+    ("health", 0.8, 1.0),
+    ("weekly_hours", 40, 60.0),
+    ("available_hours", 8, 8.0),
+    ("financial_buffer", 1000, 1000.0)
+]
+ENERGY = 1
+SKILLS_READY = 2
+NUM_FEATURES = len(STATE_FEATURES) + 1
+
+# Heuristic bonuses: (rule, action flag, bonus)
+#   rule 0: energy > 0.6  -> study
+#   rule 1: energy < 0.4  -> rest
+#   rule 2: skills_ready  -> project
+RULE_FLAGS = np.array([STUDY, REST, PROJECT], dtype=np.uint8)
+RULE_BONUS = np.array([0.2, 0.3, 0.25])
+BONUS_MATRIX = RULE_BONUS[:, None] * ((RULE_FLAGS[:, None] & ACTION_FLAGS[None, :]) != 0)
+
+
+def _feature(state: Dict, key, default) -> float:
+    value = state.get(key, default)
+    if isinstance(default, bool):
+        return float(bool(value))
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return float(default)
+    # NaN and infinities would poison the scores
+    return value if np.isfinite(value) else float(default)
+
+
+def state_matrix(states: List[Dict]) -> np.ndarray:
+    """Build an (N, NUM_FEATURES) feature matrix from raw state dicts
+
+    Missing or non-numeric values fall back to the feature's default;
+    boolean features use truthiness.
+    """
+    X = np.empty((len(states), NUM_FEATURES), dtype=np.float64)
+    X[:, 0] = 1.0
+    for j, (key, default, scale) in enumerate(STATE_FEATURES, start=1):
+        X[:, j] = [_feature(s, key, default) / scale for s in states]
+    return X
+
+
+def rule_matrix(X: np.ndarray) -> np.ndarray:
+    """(N, 3) 0/1 matrix of which heuristic rules fire for each state"""
+    return np.column_stack([
+        X[:, ENERGY] > 0.6,
+        X[:, ENERGY] < 0.4,
+        X[:, SKILLS_READY] != 0
+    ]).astype(np.float64)
+
+
+def heuristic_scores(X: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+    """Score all users x actions at once: random base plus rule bonuses"""
+    return rng.uniform(0.5, 1.0, size=(X.shape[0], len(ACTIONS))) + rule_matrix(X) @ BONUS_MATRIX
+
+
+def top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the k best actions per row, best first"""
+    k = max(1, min(k, scores.shape[1]))
+    idx = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    order = np.argsort(-np.take_along_axis(scores, idx, axis=1), axis=1)
+    return np.take_along_axis(idx, order, axis=1)
+
+
+def _heuristic_pattern_probabilities(samples: int = 20000, seed: int = 0) -> np.ndarray:
+    """P(argmax = a) of the noisy heuristic for each of the 8 rule patterns"""
+    rng = np.random.default_rng(seed)
+    patterns = ((np.arange(8)[:, None] >> np.arange(3)) & 1).astype(np.float64)
+    bonus = patterns @ BONUS_MATRIX
+    probs = np.empty((8, len(ACTIONS)))
+    for p in range(8):
+        best = (rng.uniform(0.5, 1.0, size=(samples, len(ACTIONS))) + bonus[p]).argmax(axis=1)
+        probs[p] = np.bincount(best, minlength=len(ACTIONS)) / samples
+    return probs
+
+
+HEURISTIC_PATTERN_PROBS = _heuristic_pattern_probabilities()
+
+
+def heuristic_probabilities(X: np.ndarray) -> np.ndarray:
+    """(N, A) action distribution of the noisy heuristic, marginalised over the noise"""
+    codes = (rule_matrix(X) @ np.array([1.0, 2.0, 4.0])).astype(np.int64)
+    return HEURISTIC_PATTERN_PROBS[codes]
+
+
+def explore(scores: np.ndarray, epsilon: float, rng: np.random.Generator, base_probs=None):
+    """Epsilon-greedy choice per row; returns (actions, propensities)
+
+    base_probs is the (N, A) distribution of the underlying choice when it
+    is itself random (the noisy heuristic); otherwise the argmax is assumed
+    deterministic.
+    """
+    n, num_actions = scores.shape
+    greedy = scores.argmax(axis=1)
+    explored = rng.random(n) < epsilon
+    actions = np.where(explored, rng.integers(0, num_actions, size=n), greedy)
+    if base_probs is None:
+        base = (actions == greedy).astype(np.float64)
+    else:
+        base = base_probs[np.arange(n), actions]
+    return actions, (1.0 - epsilon) * base + epsilon / num_actions
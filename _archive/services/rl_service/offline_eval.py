@@ -0,0 +1,139 @@
+"""Offline policy evaluation over logged RL decisions
+
+Reads the decision logs written by the RL service chunk by chunk through
+np.memmap and estimates the value of candidate policies with IPS,
+self-normalized IPS and doubly-robust estimators.
+
+    python offline_eval.py --log-dir decision_logs --policy heuristic --policy artifact
+"""
+import argparse
+import json
+import os
+import numpy as np
+from features import ACTIONS, NUM_FEATURES, heuristic_probabilities
+from decision_log import iter_chunks
+
+
+def greedy_probabilities(scores: np.ndarray, epsilon: float) -> np.ndarray:
+    probs = np.full(scores.shape, epsilon / scores.shape[1])
+    probs[np.arange(len(scores)), scores.argmax(axis=1)] += 1.0 - epsilon
+    return probs
+
+
+def load_policy(spec: str, policy_dir: str, epsilon: float):
+    """Map a policy spec to a function (N, d) features -> (N, A) action probabilities"""
+    if spec == "heuristic":
+        return heuristic_probabilities
+    if spec == "uniform":
+        return lambda X: np.full((len(X), len(ACTIONS)), 1.0 / len(ACTIONS))
+    if spec == "artifact" or spec.startswith("artifact:"):
+        version = spec.partition(":")[2]
+        if not version:
+            with open(os.path.join(policy_dir, "CURRENT")) as f:
+                version = f.read().strip()
+        spec = os.path.join(policy_dir, f"{version}.npy")
+    if spec.endswith(".npy"):
+        weights = np.load(spec, mmap_mode="r")
+        return lambda X: greedy_probabilities(X @ weights.T, epsilon)
+    raise ValueError(f"Unknown policy: {spec}")
+
+
+def valid_rows(chunk):
+    reward = chunk["reward"]
+    mask = np.isfinite(reward) & (chunk["propensity"] > 0)
+    return (chunk["features"][mask].astype(np.float64), chunk["action"][mask].astype(np.int64),
+            chunk["propensity"][mask].astype(np.float64), reward[mask].astype(np.float64))
+
+
+def fit_reward_model(log_dir: str, chunk_rows: int, l2: float = 1.0) -> np.ndarray:
+    """Per-action ridge regression of reward on features, from streamed normal equations"""
+    num_actions = len(ACTIONS)
+    XtX = np.repeat(l2 * np.eye(NUM_FEATURES)[None, :, :], num_actions, axis=0)
+    Xty = np.zeros((num_actions, NUM_FEATURES))
+    for chunk in iter_chunks(log_dir, chunk_rows):
+        X, a, _, r = valid_rows(chunk)
+        for action in range(num_actions):
+            mask = a == action
+            XtX[action] += X[mask].T @ X[mask]
+            Xty[action] += X[mask].T @ r[mask]
+    return np.linalg.solve(XtX, Xty[:, :, None])[:, :, 0]
+
+
+def evaluate(log_dir: str, policies: dict, chunk_rows: int = 1_000_000) -> dict:
+    theta = fit_reward_model(log_dir, chunk_rows)
+    keys = ("n", "w", "w2", "wr", "wr2", "dr", "dr2")
+    sums = {name: dict.fromkeys(keys, 0.0) for name in policies}
+    logged_reward = 0.0
+
+    for chunk in iter_chunks(log_dir, chunk_rows):
+        X, a, p, r = valid_rows(chunk)
+        if len(a) == 0:
+            continue
+        rows = np.arange(len(a))
+        q_hat = X @ theta.T
+        logged_reward += r.sum()
+        for name, policy in policies.items():
+            pi = policy(X)
+            w = pi[rows, a] / p
+            dr = (pi * q_hat).sum(axis=1) + w * (r - q_hat[rows, a])
+            s = sums[name]
+            s["n"] += len(a)
+            s["w"] += w.sum()
+            s["w2"] += (w ** 2).sum()
+            s["wr"] += (w * r).sum()
+            s["wr2"] += ((w * r) ** 2).sum()
+            s["dr"] += dr.sum()
+            s["dr2"] += (dr ** 2).sum()
+
+    results = {}
+    for name, s in sums.items():
+        n = s["n"]
+        if n == 0:
+            results[name] = {"rows": 0}
+            continue
+        ips = s["wr"] / n
+        dr = s["dr"] / n
+        results[name] = {
+            "rows": int(n),
+            "ips": ips,
+            "ips_stderr": float(np.sqrt(max(s["wr2"] / n - ips ** 2, 0.0) / n)),
+            "snips": s["wr"] / s["w"] if s["w"] > 0 else 0.0,
+            "dr": dr,
+            "dr_stderr": float(np.sqrt(max(s["dr2"] / n - dr ** 2, 0.0) / n)),
+            "effective_sample_size": s["w"] ** 2 / s["w2"] if s["w2"] > 0 else 0.0,
+            "logged_avg_reward": logged_reward / n
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline evaluation of RL policies on logged decisions")
+    parser.add_argument("--log-dir", default=os.getenv("RL_DECISION_LOG_DIR", "decision_logs"))
+    parser.add_argument("--policy-dir", default=os.getenv("RL_POLICY_DIR", "policies"))
+    parser.add_argument("--policy", action="append", default=None,
+                        help="heuristic, uniform, artifact[:version] or a path to a .npy weight file")
+    parser.add_argument("--epsilon", type=float, default=0.0, help="exploration mixed into greedy candidates")
+    parser.add_argument("--chunk-rows", type=int, default=1_000_000)
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    specs = args.policy or ["heuristic"]
+    policies = {spec: load_policy(spec, args.policy_dir, args.epsilon) for spec in specs}
+    results = evaluate(args.log_dir, policies, args.chunk_rows)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{'policy':<32} {'rows':>10} {'IPS':>9} {'SNIPS':>9} {'DR':>9} {'ESS':>10}")
+    for name, res in results.items():
+        if not res["rows"]:
+            print(f"{name:<32} {0:>10}")
+            continue
+        print(f"{name:<32} {res['rows']:>10} {res['ips']:>9.4f} {res['snips']:>9.4f} "
+              f"{res['dr']:>9.4f} {res['effective_sample_size']:>10.0f}")
+    if results:
+        print(f"logged policy average reward: {next(iter(results.values())).get('logged_avg_reward', 0.0):.4f}")
+
+
+if __name__ == "__main__":
+    main()
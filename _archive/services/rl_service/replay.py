@@ -0,0 +1,55 @@
+import numpy as np
+from threading import Lock
+
+
+class ReplayBuffer:
+    """Fixed-size experience replay backed by NumPy ring arrays"""
+
+    def __init__(self, capacity: int, num_features: int):
+        self.capacity = capacity
+        self.states = np.zeros((capacity, num_features), dtype=np.float32)
+        self.actions = np.zeros(capacity, dtype=np.int64)
+        self.rewards = np.zeros(capacity, dtype=np.float32)
+        self.next_states = np.zeros((capacity, num_features), dtype=np.float32)
+        self.dones = np.zeros(capacity, dtype=np.bool_)
+        self.pos = 0
+        self.size = 0
+        self.total_added = 0
+        self._lock = Lock()
+
+    def __len__(self):
+        return self.size
+
+    def add_batch(self, states, actions, rewards, next_states, dones):
+        """Append a batch of transitions, overwriting the oldest when full"""
+        n = len(actions)
+        if n == 0:
+            return
+        if n > self.capacity:
+            states, actions, rewards = states[-self.capacity:], actions[-self.capacity:], rewards[-self.capacity:]
+            next_states, dones = next_states[-self.capacity:], dones[-self.capacity:]
+            n = self.capacity
+        with self._lock:
+            idx = (self.pos + np.arange(n)) % self.capacity
+            self.states[idx] = states
+            self.actions[idx] = actions
+            self.rewards[idx] = rewards
+            self.next_states[idx] = next_states
+            self.dones[idx] = dones
+            self.pos = int((self.pos + n) % self.capacity)
+            self.size = min(self.size + n, self.capacity)
+            self.total_added += n
+
+    def add(self, state, action, reward, next_state, done=False):
+        self.add_batch(state[None, :], np.array([action]), np.array([reward]), next_state[None, :], np.array([done]))
+
+    def snapshot(self):
+        """Copy of the filled part of the buffer, safe to hand to another process"""
+        with self._lock:
+            n = self.size
+            return (self.states[:n].copy(), self.actions[:n].copy(), self.rewards[:n].copy(),
+                    self.next_states[:n].copy(), self.dones[:n].copy())
+
+    def sample(self, batch_size: int, rng: np.random.Generator):
+        idx = rng.integers(0, self.size, size=batch_size)
+        return self.states[idx], self.actions[idx], self.rewards[idx], self.next_states[idx], self.dones[idx]
@@ -0,0 +1,104 @@
+import multiprocessing
+import time
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from threading import Lock
+
+
+def fitted_q_iteration(states, actions, rewards, next_states, dones, num_actions,
+                       iterations=100, gamma=0.9, l2=1e-2, tol=1e-5):
+    """Linear fitted Q iteration: Q(s, a) = W[a] . s
+
+    Runs in the training process. Per-action ridge solutions are factored
+    once since the design matrices do not change between iterations.
+    """
+    d = states.shape[1]
+    W = np.zeros((num_actions, d))
+    solvers = []
+    for a in range(num_actions):
+        mask = actions == a
+        Xa = states[mask].astype(np.float64)
+        solvers.append((mask, np.linalg.inv(Xa.T @ Xa + l2 * np.eye(d)) @ Xa.T))
+
+    not_done = ~dones
+    curve = []
+    for it in range(iterations):
+        next_q = next_states @ W.T
+        targets = rewards + gamma * not_done * next_q.max(axis=1)
+        W_new = np.stack([P @ targets[mask] if mask.any() else W[a]
+                          for a, (mask, P) in enumerate(solvers)])
+        delta = float(np.abs(W_new - W).max())
+        W = W_new
+        td = targets - np.einsum("nd,nd->n", states, W[actions])
+        curve.append({
+            "iteration": it + 1,
+            "bellman_error": float(np.sqrt(np.mean(td ** 2))),
+            "mean_value": float((states @ W.T).max(axis=1).mean())
+        })
+        if delta < tol:
+            break
+    return W, curve
+
+
+class LinearQPolicy:
+    """Immutable learned policy; swapped in as a whole by reference"""
+
+    def __init__(self, weights: np.ndarray, version: str):
+        self.weights = weights
+        self.version = version
+        self.trained_at = time.time()
+
+    def scores(self, X: np.ndarray) -> np.ndarray:
+        return X @ self.weights.T
+
+
+class Trainer:
+    """Runs fitted Q iteration in a background process and publishes the result"""
+
+    def __init__(self, buffer, num_actions: int, store):
+        self.buffer = buffer
+        self.num_actions = num_actions
+        self.store = store
+        self.last_error = None
+        self._executor = None
+        self._future = None
+        self._lock = Lock()
+
+    @property
+    def running(self):
+        return self._future is not None and not self._future.done()
+
+    def start(self, episodes: int, gamma: float) -> bool:
+        with self._lock:
+            if self.running or len(self.buffer) == 0:
+                return False
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn"))
+            data = self.buffer.snapshot()
+            avg_reward = float(data[2].mean())
+            self._future = self._executor.submit(fitted_q_iteration, *data, self.num_actions, episodes, gamma)
+            self._future.add_done_callback(lambda f: self._finish(f, avg_reward))
+            return True
+
+    def _finish(self, future, avg_reward):
+        try:
+            weights, curve = future.result()
+        except Exception as e:
+            self.last_error = str(e)
+            return
+        prev = self.store.manifest
+        runs = prev.get("training_runs", 0) + 1
+        self.store.publish(weights, {
+            "training_runs": runs,
+            "training_episodes": prev.get("training_episodes", 0) + len(curve),
+            "reward_curve": (prev.get("reward_curve", []) + [
+                {"run": runs, "avg_reward": avg_reward, "experiences": self.buffer.total_added}
+            ])[-50:],
+            "value_curve": [c["mean_value"] for c in curve],
+            "bellman_error": curve[-1]["bellman_error"] if curve else None
+        })
+        self.last_error = None
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
@@ -1,10 +1,77 @@
-from fastapi import FastAPI
+import asyncio
+import logging
+import os
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
+from graph import UserGraph
+from csr import CSRSnapshot
+from bulk import BulkError, iter_ndjson_lines, parse_line, apply_chunk
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from tracing import instrument
 
 app = FastAPI()
+instrument(app, "state")
 app.add_middleware(CORSMiddleware, allow_origins=["*"], allow_methods=["*"], allow_headers=["*"])
 
+logger = logging.getLogger("state_service")
+
 graphs = {}
+# Read-optimized CSR copies; writes land in the mutable graph and are
+# folded in at the next compaction
+snapshots = {}
+COMPACT_INTERVAL = float(os.getenv("STATE_COMPACT_SECONDS", "30"))
+BULK_CHUNK = int(os.getenv("STATE_BULK_CHUNK", "500"))
+CHANGELOG_SIZE = int(os.getenv("STATE_CHANGELOG_SIZE", "1000"))
+
+def get_graph(uid):
+    # setdefault is atomic, so concurrent first writes share one graph
+    g = graphs.get(uid)
+    if g is None:
+        g = graphs.setdefault(uid, UserGraph(CHANGELOG_SIZE))
+    return g
+
+def non_negative(data, key, default=None):
+    value = data.get(key, default)
+    if value is None:
+        return None
+    try:
+        value = int(value)
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=400, detail=f"{key} must be an integer")
+    if value < 0:
+        raise HTTPException(status_code=400, detail=f"{key} must not be negative")
+    return value
+
+def compact(uid):
+    """Rebuild the user's CSR snapshot if the graph changed since the last one"""
+    g = graphs.get(uid)
+    if g is None:
+        snapshots.pop(uid, None)
+        return None
+    snap = snapshots.get(uid)
+    if snap is None or snap.version != g.version:
+        snap = CSRSnapshot(g)
+        snapshots[uid] = snap
+    return snap
+
+async def compaction_loop():
+    while True:
+        await asyncio.sleep(COMPACT_INTERVAL)
+        for uid in list(graphs):
+            # One failing graph must not stop compaction for the rest
+            try:
+                await asyncio.to_thread(compact, uid)
+            except Exception:
+                logger.exception("Compaction failed for user %s", uid)
+
+@app.on_event("startup")
+async def start_compaction():
+    app.state.compaction = asyncio.create_task(compaction_loop())
+
+@app.on_event("shutdown")
+async def stop_compaction():
+    app.state.compaction.cancel()
 
 @app.get("/health")
 def health():
@@ -12,17 +79,106 @@ def health():
 
 @app.post("/state/initialize")
 def initialize(user_id: str):
-    graphs[user_id] = {"nodes": {}, "edges": []}
-    return {"status": "success", "user_id": user_id}
+    # Clear in place so versions keep increasing and delta clients resync
+    g = get_graph(user_id)
+    with g.lock:
+        g.clear()
+    return {"status": "success", "user_id": user_id, "version": g.version}
 
 @app.post("/state/node")
 def add_node(data: dict):
-    uid = data["user_id"]
-    if uid not in graphs:
-        graphs[uid] = {"nodes": {}, "edges": []}
-    nid = f"{data['node_type']}_{len(graphs[uid]['nodes'])}"
-    graphs[uid]["nodes"][nid] = {"node_id": nid, "node_type": data["node_type"], "attributes": data.get("attributes", {})}
-    return {"node_id": nid}
+    g = get_graph(data["user_id"])
+    with g.lock:
+        node = g.add_node(data["node_type"], data.get("attributes", {}))
+    return {"node_id": node["node_id"]}
+
+@app.post("/state/node/update")
+def update_node(data: dict):
+    g = graphs.get(data["user_id"])
+    if g is None:
+        return {"error": "Not found"}
+    # Check membership under the lock: a concurrent delete may win the race
+    with g.lock:
+        if data["node_id"] not in g.nodes:
+            return {"error": "Not found"}
+        return g.update_node(data["node_id"], data.get("attributes", {}))
+
+@app.post("/state/node/delete")
+def delete_node(data: dict):
+    g = graphs.get(data["user_id"])
+    if g is None:
+        return {"error": "Not found"}
+    with g.lock:
+        if data["node_id"] not in g.nodes:
+            return {"error": "Not found"}
+        removed_edges = g.remove_node(data["node_id"])
+    return {"status": "success", "node_id": data["node_id"], "removed_edges": removed_edges}
+
+@app.post("/state/edge")
+def add_edge(data: dict):
+    g = graphs.get(data["user_id"])
+    if g is None:
+        return {"error": "Not found"}
+    try:
+        with g.lock:
+            edge = g.add_edge(data["source"], data["target"], data["edge_type"], data.get("attributes", {}))
+    except KeyError as e:
+        return {"error": f"Unknown node {e.args[0]}"}
+    return {"edge_id": edge["edge_id"]}
+
+@app.post("/state/edge/delete")
+def delete_edge(data: dict):
+    g = graphs.get(data["user_id"])
+    if g is None:
+        return {"error": "Not found"}
+    with g.lock:
+        if data["edge_id"] not in g.edges:
+            return {"error": "Not found"}
+        g.remove_edge(data["edge_id"])
+    return {"status": "success", "edge_id": data["edge_id"]}
+
+@app.post("/state/bulk")
+async def bulk(request: Request, user_id: str):
+    """Streamed NDJSON node/edge upserts, applied in atomic chunks
+
+    The body is parsed line by line as it arrives; every BULK_CHUNK
+    operations are validated and applied together, off the event loop
+    since that takes the graph lock. On the first bad line the current
+    chunk is discarded and earlier chunks stay applied.
+    """
+    g = get_graph(user_id)
+    refs = {}
+    ops = []
+    applied = 0
+    lineno = 0
+    buffer = bytearray()
+    try:
+        async for part in request.stream():
+            for line in iter_ndjson_lines(buffer, part):
+                lineno += 1
+                op = parse_line(line, lineno)
+                if op is None:
+                    continue
+                ops.append(op)
+                if len(ops) >= BULK_CHUNK:
+                    applied += await asyncio.to_thread(apply_chunk, g, ops, refs)
+                    ops = []
+        if buffer.strip():
+            lineno += 1
+            op = parse_line(bytes(buffer), lineno)
+            if op is not None:
+                ops.append(op)
+        if ops:
+            applied += await asyncio.to_thread(apply_chunk, g, ops, refs)
+    except BulkError as e:
+        return {
+            "status": "partial" if applied else "failed",
+            "user_id": user_id,
+            "applied": applied,
+            "ids": refs,
+            "error": {"line": e.line, "message": e.message}
+        }
+    return {"status": "success", "user_id": user_id, "applied": applied, "ids": refs}
 
 @app.post("/state/query")
 def query(data: dict):
@@ -30,5 +186,91 @@ def query(data: dict):
     if uid not in graphs:
         return {"error": "Not found"}
     g = graphs[uid]
-    nodes = list(g["nodes"].values())
-    return {"user_id": uid, "nodes": nodes, "edges": [], "metadata": {"num_nodes": len(nodes), "num_edges": 0, "node_types": list(set(n["node_type"] for n in nodes)) if nodes else []}}
+    since = data.get("since_version")
+    if since is not None:
+        with g.lock:
+            delta = g.changes_since(int(since))
+            version = g.version
+            metadata = g.metadata() if delta is not None else None
+        if delta is not None:
+            return {
+                "user_id": uid,
+                "full": False,
+                "since_version": int(since),
+                "version": version,
+                "changes": delta,
+                "metadata": metadata
+            }
+    offset = non_negative(data, "offset", 0)
+    limit = non_negative(data, "limit")
+    with g.lock:
+        version = g.version
+        nodes, edges, total = g.query(
+            node_type=data.get("node_type"),
+            attributes=data.get("attributes"),
+            offset=offset,
+            limit=limit
+        )
+        metadata = g.metadata()
+    return {
+        "user_id": uid,
+        "nodes": nodes,
+        "edges": edges,
+        "metadata": metadata,
+        "page": {"offset": offset, "limit": limit, "total": total},
+        "full": True,
+        "version": version
+    }
+
+@app.post("/state/neighbors")
+def neighbors(data: dict):
+    g = graphs.get(data["user_id"])
+    if g is None:
+        return {"error": "Not found"}
+    k = non_negative(data, "k", 1)
+    limit = non_negative(data, "limit")
+    with g.lock:
+        if data["node_id"] not in g.nodes:
+            return {"error": "Not found"}
+        hops, edges = g.neighborhood(
+            data["node_id"],
+            k=k,
+            direction=data.get("direction", "both"),
+            edge_type=data.get("edge_type"),
+            limit=limit
+        )
+        nodes = [{**g.nodes[nid], "hops": h} for nid, h in hops.items()]
+    return {
+        "user_id": data["user_id"],
+        "node_id": data["node_id"],
+        "nodes": nodes,
+        "edges": edges
+    }
+
+@app.post("/state/compact")
+def compact_graph(data: dict):
+    snap = compact(data["user_id"])
+    if snap is None:
+        return {"error": "Not found"}
+    return {"status": "success", "version": snap.version, "num_nodes": snap.num_nodes, "num_edges": snap.num_edges}
+
+@app.post("/state/analytics")
+def analytics(data: dict):
+    """Bulk graph analytics served from the read-only CSR snapshot"""
+    uid = data["user_id"]
+    g = graphs.get(uid)
+    if g is None:
+        return {"error": "Not found"}
+    snap = snapshots.get(uid)
+    if snap is None or data.get("fresh", False):
+        snap = compact(uid)
+    return {
+        "user_id": uid,
+        "snapshot_version": snap.version,
+        "pending_mutations": g.version - snap.version,
+        "num_nodes": snap.num_nodes,
+        "num_edges": snap.num_edges,
+        "degree_stats": snap.degree_stats(),
+        "skill_centrality": snap.centrality(data.get("node_type", "skill"), int(data.get("top", 10))),
+        "attribute_means": snap.attribute_means()
+    }
@@ -0,0 +1,89 @@
+import json
+from typing import Dict, List
+
+
+class BulkError(Exception):
+    def __init__(self, line: int, message: str):
+        super().__init__(message)
+        self.line = line
+        self.message = message
+
+
+def iter_ndjson_lines(buffer: bytearray, chunk: bytes):
+    """Feed one body chunk; yields complete lines and leaves the tail in buffer"""
+    buffer.extend(chunk)
+    start = 0
+    while True:
+        end = buffer.find(b"\n", start)
+        if end < 0:
+            break
+        yield bytes(buffer[start:end])
+        start = end + 1
+    del buffer[:start]
+
+
+def parse_line(line: bytes, lineno: int):
+    line = line.strip()
+    if not line:
+        return None
+    try:
+        op = json.loads(line)
+    except ValueError as e:
+        raise BulkError(lineno, f"Invalid JSON: {e}")
+    if not isinstance(op, dict) or op.get("op") not in ("node", "edge"):
+        raise BulkError(lineno, "Each line must be an object with op 'node' or 'edge'")
+    op["_line"] = lineno
+    return op
+
+
+def apply_chunk(graph, ops: List[Dict], refs: Dict[str, str]) -> int:
+    """Validate and apply a chunk of upserts all-or-nothing
+
+    Nodes: {"op": "node", "ref"?, "node_id"?, "node_type", "attributes"?}
+    Edges: {"op": "edge", "source", "target", "edge_type", "attributes"?}
+    Edge endpoints may be node ids or refs defined earlier in the stream.
+    """
+    with graph.lock:
+        # Check everything first so a bad line leaves the graph untouched
+        pending = {}
+        for op in ops:
+            for key in ("ref", "node_id", "node_type", "source", "target", "edge_type"):
+                if key in op and not isinstance(op[key], str):
+                    raise BulkError(op["_line"], f"{key} must be a string")
+            if not isinstance(op.get("attributes", {}), dict):
+                raise BulkError(op["_line"], "attributes must be an object")
+            if op["op"] == "node":
+                if op.get("node_id") not in graph.nodes and "node_type" not in op:
+                    raise BulkError(op["_line"], "Node upsert needs node_type or an existing node_id")
+                if "ref" in op:
+                    pending[op["ref"]] = True
+            else:
+                if "edge_type" not in op:
+                    raise BulkError(op["_line"], "Edge upsert needs edge_type")
+                for end in ("source", "target"):
+                    key = op.get(end)
+                    if key not in refs and key not in pending and key not in graph.nodes:
+                        raise BulkError(op["_line"], f"Unknown {end} {key!r}")
+
+        local = dict(refs)
+        for op in ops:
+            if op["op"] == "node":
+                nid = op.get("node_id")
+                if nid in graph.nodes:
+                    graph.update_node(nid, op.get("attributes", {}))
+                else:
+                    nid = graph.add_node(op["node_type"], op.get("attributes", {}))["node_id"]
+                if "ref" in op:
+                    local[op["ref"]] = nid
+            else:
+                source = local.get(op["source"], op["source"])
+                target = local.get(op["target"], op["target"])
+                existing = next((graph.edges[eid] for eid in graph.out_edges[source]
+                                 if graph.edges[eid]["target"] == target
+                                 and graph.edges[eid]["edge_type"] == op["edge_type"]), None)
+                if existing is not None:
+                    graph.update_edge(existing["edge_id"], op.get("attributes", {}))
+                else:
+                    graph.add_edge(source, target, op["edge_type"], op.get("attributes", {}))
+        refs.update(local)
+    return len(ops)
@@ -0,0 +1,118 @@
+import numpy as np
+from typing import Dict, Optional
+
+
+class CSRSnapshot:
+    """Read-only compressed sparse row copy of a UserGraph at one version
+
+    Outgoing edges of node i are indices[indptr[i]:indptr[i + 1]] with
+    matching edge_types; node types and numeric attributes are stored as
+    columns. Bulk analytics run as array operations on these.
+    """
+
+    def __init__(self, graph):
+        with graph.lock:
+            self.version = graph.version
+            self.node_ids = list(graph.nodes)
+            self.type_names = list(graph.by_type)
+            type_codes = {t: i for i, t in enumerate(self.type_names)}
+            self.edge_type_names = list(graph.edge_type_counts)
+            edge_codes = {t: i for i, t in enumerate(self.edge_type_names)}
+            # Copy attributes now: writers update them in place under the lock
+            nodes = [{"node_type": graph.nodes[nid]["node_type"],
+                      "attributes": dict(graph.nodes[nid]["attributes"])} for nid in self.node_ids]
+            edges = list(graph.edges.values())
+
+        self.index = {nid: i for i, nid in enumerate(self.node_ids)}
+        n = len(self.node_ids)
+        self.node_types = np.array([type_codes[node["node_type"]] for node in nodes], dtype=np.int32)
+
+        src = np.array([self.index[e["source"]] for e in edges], dtype=np.int64)
+        dst = np.array([self.index[e["target"]] for e in edges], dtype=np.int64)
+        etype = np.array([edge_codes[e["edge_type"]] for e in edges], dtype=np.int32)
+        order = np.argsort(src, kind="stable")
+        self.indices = dst[order]
+        self.edge_types = etype[order]
+        self.indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(src, minlength=n), out=self.indptr[1:])
+
+        self.attributes: Dict[str, np.ndarray] = {}
+        keys = dict.fromkeys(k for node in nodes for k in node["attributes"])
+        for key in keys:
+            values = [node["attributes"].get(key) for node in nodes]
+            if all(v is None or (isinstance(v, (int, float)) and not isinstance(v, bool)) for v in values):
+                self.attributes[key] = np.array([np.nan if v is None else v for v in values], dtype=np.float64)
+            else:
+                self.attributes[key] = np.array(values, dtype=object)
+
+    @property
+    def num_nodes(self):
+        return len(self.node_ids)
+
+    @property
+    def num_edges(self):
+        return len(self.indices)
+
+    def out_degree(self) -> np.ndarray:
+        return np.diff(self.indptr)
+
+    def in_degree(self) -> np.ndarray:
+        return np.bincount(self.indices, minlength=self.num_nodes)
+
+    def degree_stats(self) -> Dict:
+        if self.num_nodes == 0:
+            return {}
+        degree = self.out_degree() + self.in_degree()
+        return {
+            "mean": float(degree.mean()),
+            "max": int(degree.max()),
+            "median": float(np.median(degree)),
+            "isolated": int((degree == 0).sum()),
+            "by_type": {
+                name: float(degree[self.node_types == code].mean())
+                for code, name in enumerate(self.type_names)
+                if (self.node_types == code).any()
+            }
+        }
+
+    def pagerank(self, damping: float = 0.85, iterations: int = 100, tol: float = 1e-8) -> np.ndarray:
+        n = self.num_nodes
+        if n == 0:
+            return np.zeros(0)
+        out_deg = self.out_degree().astype(np.float64)
+        src = np.repeat(np.arange(n), self.out_degree())
+        dangling = out_deg == 0
+        safe_deg = np.where(dangling, 1.0, out_deg)
+        rank = np.full(n, 1.0 / n)
+        for _ in range(iterations):
+            spread = np.bincount(self.indices, weights=(rank / safe_deg)[src], minlength=n)
+            new = (1.0 - damping) / n + damping * (spread + rank[dangling].sum() / n)
+            if np.abs(new - rank).sum() < tol:
+                rank = new
+                break
+            rank = new
+        return rank
+
+    def centrality(self, node_type: Optional[str] = "skill", top: int = 10):
+        rank = self.pagerank()
+        if node_type is not None:
+            if node_type not in self.type_names:
+                return []
+            candidates = np.flatnonzero(self.node_types == self.type_names.index(node_type))
+        else:
+            candidates = np.arange(self.num_nodes)
+        best = candidates[np.argsort(-rank[candidates], kind="stable")[:top]]
+        return [{"node_id": self.node_ids[i], "score": float(rank[i])} for i in best]
+
+    def attribute_means(self) -> Dict:
+        """Per node type mean of every numeric attribute column"""
+        means = {}
+        for key, column in self.attributes.items():
+            if column.dtype != np.float64:
+                continue
+            for code, name in enumerate(self.type_names):
+                values = column[self.node_types == code]
+                values = values[~np.isnan(values)]
+                if len(values):
+                    means.setdefault(name, {})[key] = float(values.mean())
+        return means
@@ -0,0 +1,209 @@
+from collections import deque
+from itertools import islice
+from threading import RLock
+from typing import Dict, List, Optional
+
+
+class UserGraph:
+    """Typed property graph for one user
+
+    Nodes and edges get monotonic ids, adjacency is kept in both directions
+    and nodes are indexed by type, so filtered queries and k-hop traversals
+    touch only the nodes they return. Dicts are used as insertion-ordered
+    sets throughout. Every mutation bumps `version` and is appended to a
+    bounded change-log so clients can ask for deltas; callers hold `lock`
+    around mutations and whole-graph reads.
+    """
+
+    def __init__(self, changelog_size: int = 1000):
+        self.changes = deque(maxlen=changelog_size)
+        self._log_floor = 0
+        self._reset()
+        self._next_node = 0
+        self._next_edge = 0
+        self.version = 0
+        self.lock = RLock()
+
+    def _reset(self):
+        self.nodes: Dict[str, Dict] = {}
+        self.edges: Dict[str, Dict] = {}
+        self.out_edges: Dict[str, Dict[str, None]] = {}
+        self.in_edges: Dict[str, Dict[str, None]] = {}
+        self.by_type: Dict[str, Dict[str, None]] = {}
+        self.edge_type_counts: Dict[str, int] = {}
+
+    def _record(self, kind: str, op: str, item_id: str):
+        self.version += 1
+        self.changes.append((self.version, kind, op, item_id))
+
+    # Mutations
+
+    def clear(self):
+        """Drop all nodes and edges; ids and versions keep increasing"""
+        self._reset()
+        self.version += 1
+        self.changes.clear()
+        self._log_floor = self.version
+
+    def add_node(self, node_type: str, attributes: Optional[Dict] = None) -> Dict:
+        nid = f"{node_type}_{self._next_node}"
+        self._next_node += 1
+        node = {"node_id": nid, "node_type": node_type, "attributes": dict(attributes or {})}
+        self.nodes[nid] = node
+        self.out_edges[nid] = {}
+        self.in_edges[nid] = {}
+        self.by_type.setdefault(node_type, {})[nid] = None
+        self._record("node", "add", nid)
+        return node
+
+    def update_node(self, node_id: str, attributes: Dict) -> Dict:
+        node = self.nodes[node_id]
+        node["attributes"].update(attributes)
+        self._record("node", "update", node_id)
+        return node
+
+    def remove_node(self, node_id: str) -> List[str]:
+        """Remove a node and its incident edges; returns the removed edge ids"""
+        node = self.nodes[node_id]
+        removed = list(self.out_edges[node_id]) + [e for e in self.in_edges[node_id] if e not in self.out_edges[node_id]]
+        for eid in removed:
+            self.remove_edge(eid)
+        del self.nodes[node_id]
+        del self.out_edges[node_id]
+        del self.in_edges[node_id]
+        ids = self.by_type[node["node_type"]]
+        del ids[node_id]
+        if not ids:
+            del self.by_type[node["node_type"]]
+        self._record("node", "remove", node_id)
+        return removed
+
+    def add_edge(self, source: str, target: str, edge_type: str, attributes: Optional[Dict] = None) -> Dict:
+        if source not in self.nodes:
+            raise KeyError(source)
+        if target not in self.nodes:
+            raise KeyError(target)
+        eid = f"e_{self._next_edge}"
+        self._next_edge += 1
+        edge = {"edge_id": eid, "source": source, "target": target, "edge_type": edge_type,
+                "attributes": dict(attributes or {})}
+        self.edges[eid] = edge
+        self.out_edges[source][eid] = None
+        self.in_edges[target][eid] = None
+        self.edge_type_counts[edge_type] = self.edge_type_counts.get(edge_type, 0) + 1
+        self._record("edge", "add", eid)
+        return edge
+
+    def update_edge(self, edge_id: str, attributes: Dict) -> Dict:
+        edge = self.edges[edge_id]
+        edge["attributes"].update(attributes)
+        self._record("edge", "update", edge_id)
+        return edge
+
+    def remove_edge(self, edge_id: str) -> Dict:
+        edge = self.edges.pop(edge_id)
+        del self.out_edges[edge["source"]][edge_id]
+        del self.in_edges[edge["target"]][edge_id]
+        count = self.edge_type_counts[edge["edge_type"]] - 1
+        if count:
+            self.edge_type_counts[edge["edge_type"]] = count
+        else:
+            del self.edge_type_counts[edge["edge_type"]]
+        self._record("edge", "remove", edge_id)
+        return edge
+
+    # Reads
+
+    def metadata(self) -> Dict:
+        return {
+            "num_nodes": len(self.nodes),
+            "num_edges": len(self.edges),
+            "node_types": list(self.by_type),
+            "node_type_counts": {t: len(ids) for t, ids in self.by_type.items()},
+            "edge_type_counts": dict(self.edge_type_counts)
+        }
+
+    def query(self, node_type: Optional[str] = None, attributes: Optional[Dict] = None,
+              offset: int = 0, limit: Optional[int] = None):
+        """Filtered, paginated nodes plus the edges leaving them; returns (nodes, edges, total)"""
+        if offset < 0 or (limit is not None and limit < 0):
+            raise ValueError("offset and limit must not be negative")
+        if node_type is not None:
+            candidates = self.by_type.get(node_type, {})
+        else:
+            candidates = self.nodes
+        if attributes:
+            ids = (nid for nid in candidates
+                   if all(self.nodes[nid]["attributes"].get(k) == v for k, v in attributes.items()))
+            matched = list(ids)
+            total = len(matched)
+            page = matched[offset:offset + limit if limit is not None else None]
+        else:
+            total = len(candidates)
+            page = list(islice(candidates, offset, offset + limit if limit is not None else None))
+        nodes = [self.nodes[nid] for nid in page]
+        edges = [self.edges[eid] for nid in page for eid in self.out_edges[nid]]
+        return nodes, edges, total
+
+    def changes_since(self, since: int) -> Optional[Dict]:
+        """Net added/updated/removed nodes and edges after `since`
+
+        Returns None when the log no longer covers `since` (truncated,
+        cleared, or a version this graph never had) and the caller should
+        send a full snapshot instead.
+        """
+        floor = self.changes[0][0] - 1 if self.changes else self.version
+        if since > self.version or since < max(floor, self._log_floor):
+            return None
+        first_op = {}
+        for version, kind, op, item_id in reversed(self.changes):
+            if version <= since:
+                break
+            first_op[(kind, item_id)] = op
+        delta = {kind: {"added": [], "updated": [], "removed": []} for kind in ("nodes", "edges")}
+        for (kind, item_id), op in reversed(first_op.items()):
+            store = self.nodes if kind == "node" else self.edges
+            existed = op != "add"
+            bucket = delta[kind + "s"]
+            if item_id in store:
+                bucket["updated" if existed else "added"].append(store[item_id])
+            elif existed:
+                bucket["removed"].append(item_id)
+        return delta
+
+    def _adjacent(self, node_id: str, direction: str, edge_type: Optional[str]):
+        if direction in ("out", "both"):
+            for eid in self.out_edges[node_id]:
+                edge = self.edges[eid]
+                if edge_type is None or edge["edge_type"] == edge_type:
+                    yield edge, edge["target"]
+        if direction in ("in", "both"):
+            for eid in self.in_edges[node_id]:
+                edge = self.edges[eid]
+                if edge_type is None or edge["edge_type"] == edge_type:
+                    yield edge, edge["source"]
+
+    def neighborhood(self, node_id: str, k: int = 1, direction: str = "both",
+                     edge_type: Optional[str] = None, limit: Optional[int] = None):
+        """Breadth-first k-hop neighborhood; cost is proportional to what it visits
+
+        Returns ({node_id: hops}, edges traversed).
+        """
+        if node_id not in self.nodes:
+            raise KeyError(node_id)
+        hops = {node_id: 0}
+        edges = {}
+        frontier = deque([node_id])
+        while frontier:
+            current = frontier.popleft()
+            depth = hops[current]
+            if depth >= k:
+                continue
+            for edge, neighbor in self._adjacent(current, direction, edge_type):
+                if neighbor not in hops:
+                    if limit is not None and len(hops) > limit:
+                        continue
+                    hops[neighbor] = depth + 1
+                    frontier.append(neighbor)
+                edges[edge["edge_id"]] = edge
+        return hops, list(edges.values())
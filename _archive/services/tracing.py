@@ -0,0 +1,346 @@
+"""Minimal W3C traceparent tracing shared by the ACLSA services
+
+Tracing is off unless TRACE_EXPORT is set to a file path (spans are
+appended as NDJSON) or an http(s) URL (spans are POSTed as NDJSON, e.g.
+to `python tracing.py collect`). TRACE_SAMPLE_RATE picks the share of
+root requests that are traced; downstream hops follow the caller's
+sampled flag.
+
+    instrument(app, "planning")     # right after FastAPI(), before routes
+    with span("score", rows=n): ...
+    headers = inject({})
+
+    python tracing.py collect --port 4318 --out traces.ndjson
+    python tracing.py report traces.ndjson --top 5
+"""
+import argparse
+import atexit
+import contextvars
+import functools
+import inspect
+import json
+import os
+import random
+import statistics
+import sys
+import threading
+import time
+import urllib.request
+from collections import defaultdict, deque
+from contextlib import contextmanager
+
+TRACE_EXPORT = os.getenv("TRACE_EXPORT", "")
+TRACE_SAMPLE_RATE = float(os.getenv("TRACE_SAMPLE_RATE", "1.0"))
+
+# (trace_id, span_id, sampled, service) of the active span
+_current = contextvars.ContextVar("aclsa_trace", default=None)
+
+
+class BatchExporter:
+    """Buffers finished spans and writes them from a background thread
+
+    The buffer is bounded; when the exporter falls behind, the oldest
+    spans are dropped rather than slowing requests down.
+    """
+
+    def __init__(self, target: str, batch_size: int = 512, interval: float = 1.0, max_queue: int = 20000):
+        self.target = target
+        self.batch_size = batch_size
+        self.interval = interval
+        self.queue = deque(maxlen=max_queue)
+        self.wake = threading.Event()
+        self.lock = threading.Lock()
+        self.thread = None
+        self.exported = 0
+        self.failed = 0
+
+    def export(self, record):
+        self.queue.append(record)
+        if self.thread is None:
+            self._start()
+        if len(self.queue) >= self.batch_size:
+            self.wake.set()
+
+    def _start(self):
+        with self.lock:
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._run, name="trace-exporter", daemon=True)
+                self.thread.start()
+                atexit.register(self.flush)
+
+    def _run(self):
+        while True:
+            self.wake.wait(self.interval)
+            self.wake.clear()
+            self.flush()
+
+    def flush(self):
+        with self.lock:
+            batch = []
+            while self.queue:
+                batch.append(self.queue.popleft())
+            if not batch:
+                return
+            body = "".join(json.dumps(record) + "\n" for record in batch)
+            try:
+                if self.target.startswith(("http://", "https://")):
+                    request = urllib.request.Request(
+                        self.target, data=body.encode(), headers={"Content-Type": "application/x-ndjson"}
+                    )
+                    urllib.request.urlopen(request, timeout=5).close()
+                else:
+                    with open(self.target, "a") as f:
+                        f.write(body)
+                self.exported += len(batch)
+            except OSError:
+                self.failed += len(batch)
+
+
+exporter = BatchExporter(TRACE_EXPORT) if TRACE_EXPORT else None
+_default_service = "unknown"
+
+
+def parse_traceparent(header):
+    """'00-<trace_id>-<span_id>-<flags>' -> (trace_id, span_id, sampled) or None"""
+    parts = (header or "").strip().split("-")
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None
+    try:
+        sampled = int(parts[3], 16) & 1 == 1
+    except ValueError:
+        return None
+    return parts[1], parts[2], sampled
+
+
+def inject(headers: dict) -> dict:
+    """Add a traceparent header for the active span"""
+    ctx = _current.get()
+    if ctx is not None:
+        headers["traceparent"] = f"00-{ctx[0]}-{ctx[1]}-{'01' if ctx[2] else '00'}"
+    return headers
+
+
+@contextmanager
+def span(name: str, service=None, kind: str = "internal", parent=None, **attributes):
+    """Record a child span of the active one (or of parent=(trace_id, span_id, sampled))
+
+    Yields the attribute dict so callers can add to it. Unsampled and
+    untraced code gets a plain dict and no record.
+    """
+    if exporter is None:
+        yield attributes
+        return
+    ctx = parent or _current.get()
+    if ctx is None:
+        trace_id, parent_id, sampled = f"{random.getrandbits(128):032x}", None, random.random() < TRACE_SAMPLE_RATE
+    else:
+        trace_id, parent_id, sampled = ctx[0], ctx[1], ctx[2]
+    service = service or (ctx[3] if ctx is not None and len(ctx) > 3 else _default_service)
+    if not sampled:
+        # Keep propagating the unsampled decision downstream
+        token = _current.set((trace_id, parent_id or f"{random.getrandbits(64):016x}", False, service))
+        try:
+            yield attributes
+        finally:
+            _current.reset(token)
+        return
+
+    span_id = f"{random.getrandbits(64):016x}"
+    token = _current.set((trace_id, span_id, True, service))
+    start = time.time()
+    try:
+        yield attributes
+    except BaseException as e:
+        attributes["error"] = type(e).__name__
+        raise
+    finally:
+        end = time.time()
+        _current.reset(token)
+        exporter.export({
+            "trace_id": trace_id,
+            "span_id": span_id,
+            "parent_id": parent_id,
+            "name": name,
+            "service": service,
+            "kind": kind,
+            "start": start,
+            "end": end,
+            "attributes": attributes
+        })
+
+
+class TraceMiddleware:
+    """ASGI middleware opening a server span per request from the incoming traceparent"""
+
+    def __init__(self, app, service: str):
+        self.app = app
+        self.service = service
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        header = next((v.decode() for k, v in scope["headers"] if k == b"traceparent"), None)
+        parent = parse_traceparent(header)
+        with span(f"{scope['method']} {scope['path']}", service=self.service, kind="server",
+                  parent=parent) as attributes:
+            async def traced_send(message):
+                if message["type"] == "http.response.start":
+                    attributes["status"] = message["status"]
+                await send(message)
+            await self.app(scope, receive, traced_send)
+
+
+def _traced_endpoint(endpoint, service):
+    name = f"handler {endpoint.__name__}"
+    if inspect.iscoroutinefunction(endpoint):
+        @functools.wraps(endpoint)
+        async def wrapper(*args, **kwargs):
+            with span(name, service=service):
+                return await endpoint(*args, **kwargs)
+    else:
+        @functools.wraps(endpoint)
+        def wrapper(*args, **kwargs):
+            with span(name, service=service):
+                return endpoint(*args, **kwargs)
+    return wrapper
+
+
+def instrument(app, service: str):
+    """Trace a FastAPI app: server, handler and response-serialization spans
+
+    Must run before routes are declared, since FastAPI fixes each route's
+    class and response class when it is added. No-op unless TRACE_EXPORT
+    is set.
+    """
+    global _default_service
+    if exporter is None:
+        return app
+    from fastapi.responses import JSONResponse
+    from fastapi.routing import APIRoute
+
+    if _default_service == "unknown":
+        _default_service = service
+
+    class TracedJSONResponse(JSONResponse):
+        def render(self, content):
+            with span("serialize", service=service):
+                return super().render(content)
+
+    class TracedRoute(APIRoute):
+        def __init__(self, path, endpoint, **kwargs):
+            super().__init__(path, _traced_endpoint(endpoint, service), **kwargs)
+
+    app.router.default_response_class = TracedJSONResponse
+    app.router.route_class = TracedRoute
+    app.add_middleware(TraceMiddleware, service=service)
+    return app
+
+
+def load_spans(path):
+    traces = defaultdict(list)
+    with open(path) as f:
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                traces[record["trace_id"]].append(record)
+    return traces
+
+
+def critical_path(root, children):
+    """[(label, self_seconds)] along the chain of spans that set root's end time
+
+    Walks back from the span's end: the latest-ending child is on the
+    path, then the latest-ending child that started before that one, and
+    so on. Time not covered by those children is the span's own.
+    """
+    path = []
+    own = root["end"] - root["start"]
+    cursor = root["end"]
+    for child in sorted(children.get(root["span_id"], []), key=lambda c: c["end"], reverse=True):
+        # A server span may close slightly after its client saw the response
+        if child["start"] < cursor:
+            path.extend(critical_path(child, children))
+            own -= min(child["end"], cursor) - child["start"]
+            cursor = child["start"]
+    path.append((f"{root['service']}:{root['name']}", max(own, 0.0)))
+    return path
+
+
+def report(path, top: int = 5):
+    traces = load_spans(path)
+    totals = defaultdict(list)
+    rows = []
+    for trace_id, spans in traces.items():
+        ids = {s["span_id"] for s in spans}
+        children = defaultdict(list)
+        roots = []
+        for s in spans:
+            if s["parent_id"] in ids:
+                children[s["parent_id"]].append(s)
+            else:
+                roots.append(s)
+        root = max(roots, key=lambda s: s["end"] - s["start"])
+        hops = critical_path(root, children)
+        rows.append((root["end"] - root["start"], trace_id, root, hops))
+        for label, seconds in hops:
+            totals[label].append(seconds)
+
+    if not rows:
+        print("no spans")
+        return
+    rows.sort(key=lambda r: r[0], reverse=True)
+    durations = sorted(r[0] for r in rows)
+    print(f"{len(rows)} traces, p50 {1000 * durations[len(durations) // 2]:.2f} ms, "
+          f"p95 {1000 * durations[min(int(0.95 * len(durations)), len(durations) - 1)]:.2f} ms\n")
+
+    print("Critical-path time by span (all traces)")
+    grand = sum(sum(v) for v in totals.values()) or 1.0
+    print(f"  {'span':<50} {'share':>7} {'mean ms':>9} {'max ms':>9}")
+    for label, values in sorted(totals.items(), key=lambda kv: sum(kv[1]), reverse=True):
+        print(f"  {label:<50} {100 * sum(values) / grand:>6.1f}% {1000 * statistics.fmean(values):>9.2f} "
+              f"{1000 * max(values):>9.2f}")
+
+    for duration, trace_id, root, hops in rows[:top]:
+        print(f"\n{trace_id} {root['service']}:{root['name']} {1000 * duration:.2f} ms")
+        for label, seconds in reversed(hops):
+            print(f"  {label:<50} {1000 * seconds:>9.2f} ms")
+
+
+def collect(port: int, out: str):
+    """Local collector: appends POSTed NDJSON span batches to a file"""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            with lock, open(out, "ab") as f:
+                f.write(body)
+            self.send_response(204)
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    print(f"collecting spans on :{port} into {out}", file=sys.stderr)
+    ThreadingHTTPServer(("127.0.0.1", port), Handler).serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ACLSA trace collector and critical-path report")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("collect", help="receive span batches over HTTP")
+    p.add_argument("--port", type=int, default=4318)
+    p.add_argument("--out", default="traces.ndjson")
+    p = sub.add_parser("report", help="print critical-path breakdowns")
+    p.add_argument("path")
+    p.add_argument("--top", type=int, default=5, help="slowest traces to show")
+    args = parser.parse_args()
+    if args.command == "collect":
+        collect(args.port, args.out)
+    else:
+        report(args.path, args.top)
+
+
+if __name__ == "__main__":
+    main()